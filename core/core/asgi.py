@@ -1,7 +1,8 @@
 """
 ASGI config for core project.
 
-It exposes the ASGI callable as a module-level variable named ``application``.
+It exposes the ASGI callable as a module-level variable named ``application``,
+built by ``create_app()``, which gunicorn can also call itself.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -11,6 +12,16 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from core.startup import warm_up
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+
+def create_app():
+    """The ASGI application with the URLconf and templates already loaded"""
+    application = get_asgi_application()
+    warm_up()
+    return application
+
+
+application = create_app()
@@ -0,0 +1,29 @@
+"""
+Docs routes that load drf_yasg on first use.
+
+The schema views import drf_yasg, its codecs and the spec validators, which
+costs more at startup than the rest of the URLconf while few requests ever
+read the docs. The URLconf routes to these stand-ins instead; each builds
+its core.schema view the first time it is called.
+"""
+from functools import lru_cache
+
+from django.views.decorators.csrf import csrf_exempt
+
+
+def lazy_schema_view(factory, *factory_args):
+    @lru_cache(maxsize=None)
+    def load():
+        from .schema import SchemaView
+        return getattr(SchemaView, factory)(*factory_args)
+
+    @csrf_exempt
+    def view(request, *args, **kwargs):
+        return load()(request, *args, **kwargs)
+
+    return view
+
+
+schema_json = lazy_schema_view('without_ui')
+swagger_ui = lazy_schema_view('with_ui', 'swagger')
+redoc = lazy_schema_view('with_ui', 'redoc')
@@ -0,0 +1,137 @@
+"""
+The OpenAPI schema as a build artifact.
+
+Generating the schema walks every route, view and serializer, so it is done
+once per version of the code instead of on every hit: build_openapi_schema
+writes the rendered documents to OPENAPI_SCHEMA_DIR when the image is built,
+and a process that finds no artifact for its code generates and stores one
+on first request. Artifacts are keyed by a hash of the project source, which
+is also their ETag, so a deploy that changes a route or a serializer gets a
+new schema and pollers revalidate with 304s in between.
+
+The schema is public and built from an anonymous request, so it is the
+same for every caller; it omits `host`, so clients resolve paths against
+the server that served it.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from functools import lru_cache
+from importlib.metadata import version
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import quote_etag
+from drf_yasg import openapi
+from drf_yasg.app_settings import swagger_settings
+from drf_yasg.renderers import _SpecRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+from utils.conditional import etag_matches
+
+logger = logging.getLogger(__name__)
+
+API_INFO = openapi.Info(
+    title="Task Manager API",
+    default_version='v1',
+    description="API documentation for Task Manager",
+    terms_of_service="https://www.example.com/terms/",
+    contact=openapi.Contact(email="support@example.com"),
+    license=openapi.License(name="BSD License"),
+)
+
+# Source that cannot change the schema
+IGNORED_DIRS = {'migrations', 'management', '__pycache__'}
+IGNORED_FILES = {'tests.py'}
+
+
+@lru_cache(maxsize=None)
+def source_hash():
+    """Hash of the project's Python source and the drf_yasg version"""
+    digest = hashlib.sha256(version('drf-yasg').encode())
+    for root, dirs, files in os.walk(settings.BASE_DIR):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS and not d.startswith('.'))
+        for name in sorted(files):
+            if name.endswith('.py') and name not in IGNORED_FILES:
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, settings.BASE_DIR).encode())
+                with open(path, 'rb') as source:
+                    digest.update(source.read())
+    return digest.hexdigest()[:16]
+
+
+def spec_renderers():
+    """Spec renderers by format, e.g. 'json', 'yaml' and 'openapi'"""
+    return {renderer.format: renderer for renderer in swagger_settings.DEFAULT_SPEC_RENDERERS}
+
+
+def artifact_path(fmt):
+    return os.path.join(settings.OPENAPI_SCHEMA_DIR, f'schema-{source_hash()}.{fmt}')
+
+
+def generate():
+    """Render the schema in every spec format"""
+    # django.test is only needed here, not to serve a stored artifact
+    from rest_framework.test import APIRequestFactory
+    from rest_framework.views import APIView
+
+    # An empty url leaves out host and schemes, which the request would set
+    generator = swagger_settings.DEFAULT_GENERATOR_CLASS(API_INFO, url='')
+    request = APIView().initialize_request(APIRequestFactory().get('/swagger.json'))
+    schema = generator.get_schema(request=request, public=True)
+    return {fmt: renderer().render(schema) for fmt, renderer in spec_renderers().items()}
+
+
+def store(documents):
+    """Write the artifacts, each through a rename so readers never see half a file"""
+    os.makedirs(settings.OPENAPI_SCHEMA_DIR, exist_ok=True)
+    for fmt, document in documents.items():
+        fd, tmp = tempfile.mkstemp(dir=settings.OPENAPI_SCHEMA_DIR)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(document)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, artifact_path(fmt))
+
+
+@lru_cache(maxsize=None)
+def documents():
+    try:
+        result = {}
+        for fmt in spec_renderers():
+            with open(artifact_path(fmt), 'rb') as f:
+                result[fmt] = f.read()
+        return result
+    except FileNotFoundError:
+        pass
+
+    result = generate()
+    try:
+        store(result)
+    except OSError:
+        # A read-only filesystem still serves the schema from memory
+        logger.warning('Could not store the OpenAPI schema in %s', settings.OPENAPI_SCHEMA_DIR, exc_info=True)
+    return result
+
+
+class SchemaView(get_schema_view(API_INFO, public=True, permission_classes=[permissions.AllowAny])):
+    """Serves spec formats from the artifact; the UI pages load it from `?format=openapi`"""
+
+    def get(self, request, version='', format=None):
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, _SpecRenderer):
+            return super().get(request, version, format)
+
+        etag = quote_etag(source_hash())
+        if etag_matches(request, etag):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                documents()[renderer.format.lstrip('.')],
+                content_type=f'{renderer.media_type}; charset={renderer.charset}',
+            )
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
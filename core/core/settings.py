@@ -13,6 +13,8 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+import dj_database_url
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -54,6 +56,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'utils.audit.AuditMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -81,16 +84,49 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# DATABASE_URL selects the backend, e.g. postgres://user:pass@db:5432/task_manager;
+# without it the bundled SQLite file is used. Connections are kept open for
+# CONN_MAX_AGE seconds and health-checked before reuse. Set DATABASE_POOL to
+# 'pgbouncer' when connecting through a transaction-mode PgBouncer, which
+# cannot keep server-side cursors open across transactions.
+
+DATABASE_POOL = os.environ.get('DATABASE_POOL', '')
+
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': dj_database_url.config(
+        default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
+        conn_max_age=int(os.environ.get('CONN_MAX_AGE', 600)),
+        conn_health_checks=True,
+        disable_server_side_cursors=DATABASE_POOL == 'pgbouncer',
+    )
 }
 
 AUTH_USER_MODEL = 'users.User'
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory is per process; set REDIS_URL so invalidations reach every worker.
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Sessions are read from the cache and written through to django_session,
+# which still serves a cache miss; purge_sessions deletes the expired rows
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -112,20 +148,48 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'utils.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
 }
 
+# Default page size for the task list API; clients may override it with
+# ?page_size= up to TaskCursorPagination.max_page_size.
+TASK_PAGE_SIZE = int(os.environ.get('TASK_PAGE_SIZE', 50))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    # The JSON login has no session login() to stamp it
+    'UPDATE_LAST_LOGIN': True,
+    # Revokes rotated tokens in users.tokens instead of the token_blacklist app
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.RevocableTokenRefreshSerializer',
 }
 
+# Seconds a JWT-authenticated user snapshot is served from cache
+JWT_USER_CACHE_TIMEOUT = int(os.environ.get('JWT_USER_CACHE_TIMEOUT', 60))
+
+# Seconds a rendered web task table is kept; writes invalidate it sooner
+TASK_TABLE_CACHE_TIMEOUT = int(os.environ.get('TASK_TABLE_CACHE_TIMEOUT', 3600))
+
+# Task search ranks only this many of the newest matches a user can see
+TASK_SEARCH_WINDOW = int(os.environ.get('TASK_SEARCH_WINDOW', 1000))
+
+# Open tasks due within this many days get a due-soon notice from scan_due_tasks
+TASK_DUE_SOON_DAYS = int(os.environ.get('TASK_DUE_SOON_DAYS', 2))
+
+# Password checks allowed to run at once per process, and the seconds a login
+# waits for a free slot before it is answered with 429
+LOGIN_HASH_CONCURRENCY = int(os.environ.get('LOGIN_HASH_CONCURRENCY', 2))
+LOGIN_HASH_WAIT = float(os.environ.get('LOGIN_HASH_WAIT', 2))
+
+# Where build_openapi_schema and the schema views keep the rendered schema
+OPENAPI_SCHEMA_DIR = os.environ.get('OPENAPI_SCHEMA_DIR', BASE_DIR / 'openapi')
+
 
 LOGIN_URL = '/users/login/'
 LOGIN_REDIRECT_URL = '/tasks/dashboard/'
@@ -0,0 +1,28 @@
+"""
+Warm-up for app servers that preload the application.
+
+Django imports the URLconf, and with it every view module, on the first
+request, and compiles each template the first time it is rendered.
+warm_up() does both ahead of time. Under gunicorn --preload it runs once in
+the master and every forked worker inherits the loaded modules and compiled
+templates, so a freshly rolled worker answers its first request at steady
+state. It opens no database or cache connection, as those must not be
+shared across a fork.
+"""
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from django.urls import get_resolver
+
+
+def warm_up():
+    get_resolver().url_patterns
+
+    # Third-party templates (admin, DRF) are left to compile on demand
+    base_dir = Path(settings.BASE_DIR)
+    for engine in engines.all():
+        for directory in map(Path, engine.template_dirs):
+            if base_dir in directory.parents:
+                for template in directory.rglob('*.html'):
+                    engine.get_template(template.relative_to(directory).as_posix())
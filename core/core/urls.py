@@ -16,24 +16,9 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include, re_path
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
 from django.shortcuts import redirect
 
-
-schema_view = get_schema_view(
-   openapi.Info(
-      title="Task Manager API",
-      default_version='v1',
-      description="API documentation for Task Manager",
-      terms_of_service="https://www.example.com/terms/",
-      contact=openapi.Contact(email="support@example.com"),
-      license=openapi.License(name="BSD License"),
-   ),
-   public=True,
-   permission_classes=[permissions.AllowAny],
-)
+from . import docs
 
 
 def redirect_to_login(request):
@@ -47,8 +32,8 @@ urlpatterns = [
 
 
     # Swagger URLs
-    re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    re_path(r'^swagger(?P<format>\.json|\.yaml)$', docs.schema_json, name='schema-json'),
+    path('swagger/', docs.swagger_ui, name='schema-swagger-ui'),
+    path('redoc/', docs.redoc, name='schema-redoc'),
     
 ]
@@ -1,7 +1,8 @@
 """
 WSGI config for core project.
 
-It exposes the WSGI callable as a module-level variable named ``application``.
+It exposes the WSGI callable as a module-level variable named ``application``,
+built by ``create_app()``, which gunicorn can also call itself.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
@@ -11,6 +12,16 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from core.startup import warm_up
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_wsgi_application()
+
+def create_app():
+    """The WSGI application with the URLconf and templates already loaded"""
+    application = get_wsgi_application()
+    warm_up()
+    return application
+
+
+application = create_app()
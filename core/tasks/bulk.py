@@ -0,0 +1,89 @@
+"""
+Batched task writes behind the bulk API endpoints.
+
+Rows are written with bulk_create/bulk_update, one transaction per chunk,
+so a failure only rolls back its own chunk. Everything Task.save() would
+have done is applied by hand: audit users, completed_at, owner_admin, the
+row version, the dashboard counters, the analytics rollups and the cached
+task tables.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import counters, fragments, rollups
+from .models import Task
+
+CHUNK_SIZE = 500
+STATUS_UPDATE_FIELDS = [
+    'status', 'completion_report', 'worked_hours', 'completed_at',
+    'updated_by', 'updated_at', 'version',
+]
+
+
+def chunked(items, size=CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def create_tasks(rows, user):
+    """Insert validated TaskSerializer rows on behalf of `user`"""
+    tasks = []
+    for row in rows:
+        task = Task(**row, assigned_by=user, created_by=user, updated_by=user)
+        # The assignee comes fully loaded from validation, admin_id included
+        task.owner_admin_id = task.assigned_to.admin_id
+        task.set_completed_at()
+        tasks.append(task)
+    
+    for chunk in chunked(tasks):
+        with transaction.atomic():
+            Task.objects.bulk_create(chunk)
+            changes = [(None, counters.task_values(task)) for task in chunk]
+            counters.apply_changes(changes)
+            rollups.apply_changes([(None, rollups.task_values(task)) for task in chunk])
+            fragments.invalidate_tasks(*(new for _, new in changes))
+        for task in chunk:
+            task._remember_loaded_values()
+    return tasks
+
+
+def update_statuses(updates, user):
+    """Apply validated status rows to their tasks; `updates` is [(task, row)]"""
+    now = timezone.now()
+    # Values each task was last given in this call, so a task that appears
+    # twice moves from its previous row's values, not the loaded ones again
+    written = {}
+    for chunk in chunked(updates):
+        changes, rollup_changes = [], []
+        for task, row in chunk:
+            old, old_rollup = written.get(task.pk) or (
+                counters.stored_values(task), rollups.stored_values(task)
+            )
+            for field in ('status', 'completion_report', 'worked_hours'):
+                if field in row:
+                    setattr(task, field, row[field])
+            task.set_completed_at()
+            task.updated_by = user
+            task.updated_at = now
+            written[task.pk] = (counters.task_values(task), rollups.task_values(task))
+            changes.append((old, written[task.pk][0]))
+            rollup_changes.append((old_rollup, written[task.pk][1]))
+        with transaction.atomic():
+            # A repeated task is the same object, so it is written once; its
+            # stored version moves on by one per row, in the UPDATE itself as
+            # Task.save() does, and is read back
+            tasks = {task.pk: task for task, _ in chunk}
+            for pk, rows in Counter(task.pk for task, _ in chunk).items():
+                tasks[pk].version = F('version') + rows
+            Task.objects.bulk_update(tasks.values(), STATUS_UPDATE_FIELDS)
+            for pk, version in Task.objects.filter(pk__in=tasks).values_list('pk', 'version'):
+                tasks[pk].version = version
+            counters.apply_changes(changes)
+            rollups.apply_changes(rollup_changes)
+            fragments.invalidate_tasks(*(value for change in changes for value in change))
+        for task, _ in chunk:
+            task._remember_loaded_values()
+    return [task for task, _ in updates]
@@ -0,0 +1,254 @@
+"""
+Incrementally maintained TaskCounter rows behind the admin dashboard.
+
+Every task contributes to the counter of its assignee (USER scope), of each
+admin it is visible to through TaskQuerySet.visible_to (ADMIN scope) and of
+the GLOBAL row. Writes apply the difference between the old and the new
+contribution with F() updates; a missing counter row is built from live
+aggregates the first time it is touched, so no backfill is needed.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import Task, TaskCounter
+
+STATUS_FIELDS = {
+    'PENDING': 'pending',
+    'IN_PROGRESS': 'in_progress',
+    'COMPLETED': 'completed',
+}
+COUNTER_FIELDS = ('pending', 'in_progress', 'completed', 'worked_hours', 'overdue')
+TRACKED_FIELDS = (
+    'status', 'assigned_to_id', 'owner_admin_id', 'assigned_by_id',
+    'worked_hours', 'due_date',
+)
+
+
+def _normalize(values):
+    # Attributes set by hand may still hold raw input such as '2030-01-01'
+    for name in ('due_date', 'worked_hours'):
+        values[name] = Task._meta.get_field(name).to_python(values[name])
+    return values
+
+
+def task_values(task):
+    return _normalize({attname: getattr(task, attname) for attname in TRACKED_FIELDS})
+
+
+def stored_values(task):
+    """Tracked values as last loaded from or written to the database, if known"""
+    loaded = getattr(task, '_loaded_values', {})
+    if all(attname in loaded for attname in TRACKED_FIELDS):
+        return _normalize({attname: loaded[attname] for attname in TRACKED_FIELDS})
+    return None
+
+
+def record_save(task, created):
+    new = task_values(task)
+    if created:
+        apply_change(None, new)
+        return
+    old = stored_values(task)
+    if old is None:
+        # Unknown previous row: rebuild what we can see from live data
+        for scope, user_id in counter_scopes(new):
+            refresh_counter(scope, user_id)
+        return
+    apply_change(old, new)
+
+
+def record_delete(task):
+    # Never create rows here: during a cascading user delete the counter's
+    # own user may be about to disappear. Missing rows are built lazily.
+    apply_changes([(stored_values(task) or task_values(task), None)], create_missing=False)
+
+
+def counter_scopes(values):
+    """(scope, user_id) keys a task row counts towards"""
+    scopes = [('GLOBAL', None)]
+    if values['assigned_to_id']:
+        scopes.append(('USER', values['assigned_to_id']))
+    for admin_id in {values['owner_admin_id'], values['assigned_by_id']} - {None}:
+        scopes.append(('ADMIN', admin_id))
+    return scopes
+
+
+def viewer_scope(user):
+    """The (scope, user_id) whose tasks TaskQuerySet.visible_to returns"""
+    if user.role == 'SUPERADMIN':
+        return ('GLOBAL', None)
+    if user.role in ('ADMIN', 'USER'):
+        return (user.role, user.pk)
+    return None
+
+
+def is_overdue(values, today):
+    return values['status'] != 'COMPLETED' and values['due_date'] < today
+
+
+def contribution(values, today):
+    amounts = defaultdict(int)
+    amounts[STATUS_FIELDS[values['status']]] += 1
+    amounts['worked_hours'] += values['worked_hours'] or Decimal(0)
+    amounts['overdue'] += int(is_overdue(values, today))
+    return amounts
+
+
+def apply_change(old, new):
+    """Move counters from the `old` task values to the `new` ones (either may be None)"""
+    apply_changes([(old, new)])
+
+
+def apply_changes(changes, create_missing=True):
+    """Apply many (old, new) pairs with one UPDATE per affected counter row"""
+    today = timezone.localdate()
+    deltas = defaultdict(lambda: defaultdict(int))
+    for old, new in changes:
+        for values, sign in ((old, -1), (new, 1)):
+            if values is None:
+                continue
+            amounts = contribution(values, today)
+            for key in counter_scopes(values):
+                for field, amount in amounts.items():
+                    deltas[key][field] += sign * amount
+
+    for (scope, user_id), delta in deltas.items():
+        delta = {field: amount for field, amount in delta.items() if amount}
+        if delta:
+            _apply_delta(scope, user_id, delta, today, create_missing)
+
+
+def _apply_delta(scope, user_id, delta, today, create_missing):
+    counters = TaskCounter.objects.filter(scope=scope, user_id=user_id)
+    overdue = delta.pop('overdue', 0)
+    if delta:
+        updated = counters.update(**{field: F(field) + amount for field, amount in delta.items()})
+    else:
+        updated = counters.exists()
+    if not updated:
+        if create_missing:
+            # The row is built from live data, which already includes this write
+            refresh_counter(scope, user_id, today)
+        return
+    if overdue:
+        counters.filter(overdue_as_of=today).update(overdue=F('overdue') + overdue)
+
+
+def scope_queryset(scope, user_id):
+    if scope == 'USER':
+        return Task.objects.filter(assigned_to_id=user_id)
+    if scope == 'ADMIN':
+        return Task.objects.filter(Q(owner_admin_id=user_id) | Q(assigned_by_id=user_id))
+    return Task.objects.all()
+
+
+def live_aggregates(today):
+    return {
+        'pending': Count('id', filter=Q(status='PENDING')),
+        'in_progress': Count('id', filter=Q(status='IN_PROGRESS')),
+        'completed': Count('id', filter=Q(status='COMPLETED')),
+        'worked_hours': Sum('worked_hours'),
+        'overdue': Count('id', filter=Q(due_date__lt=today) & ~Q(status='COMPLETED')),
+    }
+
+
+def _clean(row):
+    row['worked_hours'] = row['worked_hours'] or Decimal(0)
+    return row
+
+
+def refresh_counter(scope, user_id, today=None):
+    """Recompute one counter row from the task table"""
+    today = today or timezone.localdate()
+    values = _clean(scope_queryset(scope, user_id).aggregate(**live_aggregates(today)))
+    try:
+        with transaction.atomic():
+            counter, _ = TaskCounter.objects.update_or_create(
+                scope=scope, user_id=user_id,
+                defaults={**values, 'overdue_as_of': today}
+            )
+    except IntegrityError:
+        # A concurrent writer created it first; theirs is built from the same data
+        counter = TaskCounter.objects.get(scope=scope, user_id=user_id)
+    return counter
+
+
+def get_counter(scope, user_id=None):
+    """Read a counter row, refreshing overdue once per day"""
+    today = timezone.localdate()
+    counter = TaskCounter.objects.filter(scope=scope, user_id=user_id).first()
+    if counter is None:
+        return refresh_counter(scope, user_id, today)
+    if counter.overdue_as_of != today:
+        counter.overdue = scope_queryset(scope, user_id).filter(
+            due_date__lt=today
+        ).exclude(status='COMPLETED').count()
+        counter.overdue_as_of = today
+        counter.save(update_fields=['overdue', 'overdue_as_of'])
+    return counter
+
+
+def compute_all(today=None):
+    """Live aggregates for every counter row, keyed by (scope, user_id)"""
+    today = today or timezone.localdate()
+    aggregates = live_aggregates(today)
+    rows = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+
+    def add(key, values):
+        for field in COUNTER_FIELDS:
+            rows[key][field] += values[field] or 0
+
+    add(('GLOBAL', None), Task.objects.aggregate(**aggregates))
+    for row in Task.objects.values('assigned_to_id').annotate(**aggregates).order_by():
+        add(('USER', row['assigned_to_id']), row)
+    for row in Task.objects.filter(owner_admin__isnull=False).values(
+        'owner_admin_id'
+    ).annotate(**aggregates).order_by():
+        add(('ADMIN', row['owner_admin_id']), row)
+    # Tasks an admin assigned outside their own users count for them too
+    for row in Task.objects.filter(assigned_by__isnull=False).exclude(
+        owner_admin_id=F('assigned_by_id')
+    ).values('assigned_by_id').annotate(**aggregates).order_by():
+        add(('ADMIN', row['assigned_by_id']), row)
+
+    for row in rows.values():
+        _clean(row)
+    return rows
+
+
+def rebuild(today=None):
+    """Replace every counter row with live aggregates; returns the row count"""
+    today = today or timezone.localdate()
+    rows = compute_all(today)
+    with transaction.atomic():
+        TaskCounter.objects.all().delete()
+        TaskCounter.objects.bulk_create([
+            TaskCounter(scope=scope, user_id=user_id, overdue_as_of=today, **values)
+            for (scope, user_id), values in rows.items()
+        ], batch_size=1000)
+    return len(rows)
+
+
+def find_mismatches(today=None):
+    """Stored counters that disagree with live aggregates: [(key, stored, live)]"""
+    today = today or timezone.localdate()
+    live = compute_all(today)
+    stored = {}
+    for counter in TaskCounter.objects.all():
+        values = {field: getattr(counter, field) for field in COUNTER_FIELDS}
+        if counter.overdue_as_of != today:
+            values.pop('overdue')
+        stored[(counter.scope, counter.user_id)] = values
+
+    empty = dict.fromkeys(COUNTER_FIELDS, 0)
+    mismatches = []
+    for key, values in stored.items():
+        expected = {field: live.get(key, empty)[field] for field in values}
+        if values != expected:
+            mismatches.append((key, values, expected))
+    # Rows never touched since deployment are built lazily and are not missing
+    return mismatches
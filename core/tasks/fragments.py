@@ -0,0 +1,82 @@
+"""
+Versioned cache of the rendered task table on the web task list.
+
+A viewer sees tasks through exactly one counter scope (see
+counters.counter_scopes): superadmins the GLOBAL scope, admins their ADMIN
+scope and users their USER scope. Each scope has a version number in the
+cache and every fragment key embeds it, so a write only increments the
+versions of the scopes it touches; stale fragments are never read again and
+simply expire.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+from utils.conditional import bump_versions, cache_version
+from .counters import counter_scopes, viewer_scope
+
+HITS_KEY = 'task-table:hits'
+MISSES_KEY = 'task-table:misses'
+
+
+def version_key(scope, user_id):
+    return f'task-table:version:{scope}:{user_id or ""}'
+
+
+def get_version(scope, user_id):
+    return cache_version(version_key(scope, user_id))
+
+
+def table_key(user, filters, page_number):
+    """Fragment key for one filtered page of the user's table, or None if uncacheable"""
+    scope = viewer_scope(user)
+    if scope is None:
+        return None
+    params = repr((sorted(filters.items()), page_number, settings.TASK_PAGE_SIZE))
+    digest = hashlib.md5(params.encode()).hexdigest()
+    return f'task-table:{scope[0]}:{scope[1] or ""}:{get_version(*scope)}:{digest}'
+
+
+def get_table(key):
+    table = cache.get(key)
+    _count(MISSES_KEY if table is None else HITS_KEY)
+    return None if table is None else mark_safe(table)
+
+
+def set_table(key, table):
+    cache.set(key, str(table), settings.TASK_TABLE_CACHE_TIMEOUT)
+
+
+def _count(key):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); losing one sample is fine
+        pass
+
+
+def stats():
+    hits, misses = cache.get(HITS_KEY, 0), cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
+
+
+def invalidate(scopes):
+    """Bump the version of each (scope, user_id) once the transaction commits"""
+    bump_versions(version_key(scope, user_id) for scope, user_id in scopes)
+
+
+def invalidate_tasks(*values):
+    """Invalidate every scope that sees a task with any of the given values"""
+    invalidate(
+        scope for task_values in values if task_values is not None
+        for scope in counter_scopes(task_values)
+    )
+
@@ -0,0 +1,78 @@
+"""Helpers shared by the bench_* management commands."""
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from tasks.models import Task
+from users.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Run a benchmark inside a transaction that is always thrown away"""
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def timed(func, repeat=5):
+    """Best wall-clock time of `repeat` calls, in milliseconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def seed_users(admins, users_per_admin, prefix='bench'):
+    """Create admins with their managed users; returns (admins, users)"""
+    admin_objs = User.objects.bulk_create([
+        User(username=f'{prefix}-admin-{i}', role='ADMIN') for i in range(admins)
+    ])
+    user_objs = User.objects.bulk_create([
+        User(username=f'{prefix}-user-{a.pk}-{i}', role='USER', admin=a)
+        for a in admin_objs for i in range(users_per_admin)
+    ])
+    return admin_objs, user_objs
+
+
+def seed_tasks(count, users, batch_size=5000, describe=None, **fields):
+    """
+    Bulk insert `count` tasks spread round-robin over `users`;
+    `describe(i)`, if given, supplies each task's description.
+    """
+    statuses = [choice for choice, _ in Task.STATUS_CHOICES]
+    today = date.today()
+    now = timezone.now()
+    created = 0
+    while created < count:
+        batch = []
+        for i in range(created, min(created + batch_size, count)):
+            user = users[i % len(users)]
+            status = statuses[i % len(statuses)]
+            batch.append(Task(
+                title=f'Task {i}',
+                assigned_to=user,
+                assigned_by_id=user.admin_id,
+                owner_admin_id=user.admin_id,
+                due_date=today + timedelta(days=i % 60 - 30),
+                status=status,
+                completed_at=now if status == 'COMPLETED' else None,
+                description=describe(i) if describe else '',
+                **fields
+            ))
+        Task.objects.bulk_create(batch, batch_size=batch_size)
+        created += len(batch)
+    return created
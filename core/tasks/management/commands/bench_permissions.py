@@ -0,0 +1,49 @@
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from tasks.models import Task
+from utils.permissions import IsAdminOrTaskOwner
+from ._bench import rolled_back, seed_tasks, seed_users
+
+
+def legacy_has_object_permission(request, view, obj):
+    """IsAdminOrTaskOwner as it was before RequestAccess"""
+    if request.user.role in ['ADMIN', 'SUPERADMIN']:
+        return True
+    return obj.assigned_to == request.user
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure per-object permission cost on a task list page, comparing '
+        'the legacy related-object comparison with RequestAccess. Data is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=500)
+
+    def per_object_us(self, check, request, tasks_factory):
+        tasks = tasks_factory()
+        start = time.perf_counter()
+        for task in tasks:
+            check(request, None, task)
+        return (time.perf_counter() - start) * 1_000_000 / len(tasks)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            _, users = seed_users(1, 1)
+            user = users[0]
+            seed_tasks(options['tasks'], users)
+            # A page as the list view loads it before select_related was added
+            page = lambda: list(Task.objects.filter(assigned_to=user))
+
+            checks = {
+                'legacy': legacy_has_object_permission,
+                'RequestAccess': IsAdminOrTaskOwner().has_object_permission,
+            }
+            for name, check in checks.items():
+                request = SimpleNamespace(user=user)
+                cost = self.per_object_us(check, request, page)
+                self.stdout.write(f'{name:>14}: {cost:8.1f} us per object')
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.models import Task
+from utils.audit import audit_as, get_audit_user
+from ._bench import rolled_back, seed_tasks, seed_users
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure Task.save() throughput with and without an audit context, and '
+        'the cost of resolving the audit user on its own. Data is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=2000)
+        parser.add_argument('--lookups', type=int, default=100_000)
+
+    def saves_per_second(self, tasks):
+        start = time.perf_counter()
+        for task in tasks:
+            task.save(update_fields=['updated_at', 'updated_by'])
+        return len(tasks) / (time.perf_counter() - start)
+
+    def lookup_us(self, count):
+        start = time.perf_counter()
+        for _ in range(count):
+            get_audit_user()
+        return (time.perf_counter() - start) * 1_000_000 / count
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            admins, users = seed_users(1, 10)
+            seed_tasks(options['tasks'], users)
+            tasks = list(Task.objects.filter(assigned_to__in=users))
+
+            rate = self.saves_per_second(tasks)
+            self.stdout.write(f'   no context: {rate:8.0f} saves/s')
+            with audit_as(admins[0]):
+                rate = self.saves_per_second(tasks)
+                self.stdout.write(f'     audit_as: {rate:8.0f} saves/s')
+                cost = self.lookup_us(options['lookups'])
+            self.stdout.write(f'audit lookup: {cost:8.2f} us per save')
@@ -0,0 +1,55 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from tasks.models import Task
+from tasks.search import search
+from ._bench import rolled_back, seed_tasks, seed_users, timed
+
+WORDS = (
+    'login signup invoice report export dashboard billing refund email '
+    'password session upload profile search mobile layout cache deploy'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the first page of ranked task search for a superadmin and an '
+        'admin, for a rare and a common term. Data is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1_000_000)
+        parser.add_argument('--admins', type=int, default=50)
+        parser.add_argument('--users-per-admin', type=int, default=20)
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+
+        def describe(i):
+            # Every 10 000th task mentions a rare word
+            words = rng.sample(WORDS, 6) + (['zeppelin'] if i % 10_000 == 0 else [])
+            return ' '.join(words)
+
+        with rolled_back():
+            admins, users = seed_users(options['admins'], options['users_per_admin'])
+            self.stdout.write(f"Seeding {options['tasks']} tasks...")
+            seed_tasks(options['tasks'], users, describe=describe)
+            if connection.vendor == 'postgresql':
+                # Plan against statistics of the seeded rows, as autovacuum would
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE tasks_task')
+            superadmin = admins[0]
+            superadmin.role = 'SUPERADMIN'
+            viewers = {'superadmin': superadmin, 'admin': admins[len(admins) // 2]}
+
+            for viewer_name, viewer in viewers.items():
+                for text in ('zeppelin', 'invoice', 'invoice refund'):
+                    # search() itself runs the query that bounds the window
+                    page_ms = timed(lambda: list(search(
+                        Task.objects.visible_to(viewer).with_users(), text, viewer
+                    )[:options['page_size']]), options['repeat'])
+                    self.stdout.write(f'{viewer_name:>10} {text!r:>18}: first page {page_ms:.1f} ms')
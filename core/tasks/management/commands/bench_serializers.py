@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from tasks.models import Task
+from tasks.serializers import TaskReportSerializer, TaskSerializer, ValuesSerializer
+from ._bench import rolled_back, seed_tasks, seed_users, timed
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare rows per second of the DRF serializers with ValuesSerializer, '
+        'database fetch included, and check that both render identical JSON. '
+        'Data is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        count = options['tasks']
+        renderer = JSONRenderer()
+        with rolled_back():
+            admins, users = seed_users(2, 10)
+            seed_tasks(count, users, describe=lambda i: 'x' * 200, worked_hours=Decimal('1.5'))
+            tasks = Task.objects.filter(assigned_to__in=users).order_by('-created_at', '-id')
+
+            for serializer_class, queryset in (
+                (TaskSerializer, tasks.with_users()),
+                (TaskReportSerializer, tasks.select_related('assigned_to')),
+            ):
+                rows = ValuesSerializer(serializer_class())
+                values = tasks.values(*rows.lookups)
+                results = {}
+
+                def drf():
+                    results['drf'] = serializer_class(list(queryset), many=True).data
+
+                def fast():
+                    results['fast'] = rows.render(values)
+
+                name = serializer_class.__name__
+                for label, func in (('DRF', drf), ('values', fast)):
+                    ms = timed(func, options['repeat'])
+                    self.stdout.write(f'{name:>20} {label:>6}: {count / ms * 1000:10.0f} rows/s ({ms:.0f} ms)')
+                if renderer.render(results['drf']) != renderer.render(results['fast']):
+                    raise CommandError(f'{name}: ValuesSerializer output differs')
+        self.stdout.write(self.style.SUCCESS('Outputs are byte-for-byte identical.'))
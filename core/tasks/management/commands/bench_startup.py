@@ -0,0 +1,82 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: boots core.wsgi the way a worker does, then
+# answers one request through the WSGI callable without a server.
+CHILD = '''
+import json, os, sys, time
+start = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+from core.wsgi import application
+booted = time.perf_counter()
+path, _, query = sys.argv[1].partition('?')
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+    'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+    'wsgi.url_scheme': 'http', 'wsgi.input': sys.stdin.buffer, 'wsgi.errors': sys.stderr,
+}
+status = []
+b''.join(application(environ, lambda s, headers, exc_info=None: status.append(s)))
+done = time.perf_counter()
+print(json.dumps({'status': status[0], 'boot': booted - start, 'request': done - booted}))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure worker cold start: boot time and time to the first response '
+        'of fresh interpreters importing core.wsgi, and the import cost per '
+        'top-level package from python -X importtime.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--path', default='/tasks/api-task')
+        parser.add_argument('--top', type=int, default=12)
+
+    def run_child(self, path, *flags):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, *flags, '-c', CHILD, path],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, env=os.environ.copy(),
+        )
+        elapsed = time.perf_counter() - started
+        if result.returncode:
+            raise CommandError(result.stderr)
+        return json.loads(result.stdout.splitlines()[-1]), elapsed, result.stderr
+
+    def handle(self, *args, **options):
+        path = options['path']
+        boots, requests, totals = [], [], []
+        for _ in range(options['runs']):
+            timings, elapsed, _ = self.run_child(path)
+            boots.append(timings['boot'])
+            requests.append(timings['request'])
+            totals.append(elapsed)
+
+        self.stdout.write(f'GET {path}: {timings["status"]}, median of {options["runs"]} cold starts')
+        for label, values in (
+            ('boot (core.wsgi)', boots),
+            ('first request', requests),
+            ('process start to response', totals),
+        ):
+            self.stdout.write(f'{label:>26}: {statistics.median(values) * 1000:7.1f} ms')
+
+        # Self time summed per top-level package, so nested imports count once
+        _, _, stderr = self.run_child(path, '-X', 'importtime')
+        packages = defaultdict(int)
+        for line in stderr.splitlines():
+            if line.startswith('import time:') and not line.endswith('package'):
+                self_us, _, name = line[len('import time:'):].split('|')
+                packages[name.strip().split('.')[0]] += int(self_us)
+        self.stdout.write(f'Import time by package (total {sum(packages.values()) / 1000:.1f} ms):')
+        for name, us in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f'{name:>26}: {us / 1000:7.1f} ms')
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from tasks.models import Task
+from ._bench import rolled_back, seed_tasks, seed_users, timed
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the legacy OR-of-querysets admin filter with '
+        'TaskQuerySet.visible_to on a synthetic table. Data is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1_000_000)
+        parser.add_argument('--admins', type=int, default=50)
+        parser.add_argument('--users-per-admin', type=int, default=20)
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            admins, users = seed_users(options['admins'], options['users_per_admin'])
+            self.stdout.write(f"Seeding {options['tasks']} tasks...")
+            seed_tasks(options['tasks'], users)
+            admin = admins[len(admins) // 2]
+
+            plans = {
+                'legacy': lambda: (
+                    Task.objects.filter(assigned_to__admin=admin)
+                    | Task.objects.filter(assigned_by=admin)
+                ),
+                'visible_to': lambda: Task.objects.visible_to(admin),
+            }
+            for name, build in plans.items():
+                queryset = build()
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                self.stdout.write(queryset.explain())
+                count_ms = timed(queryset.count, options['repeat'])
+                page_ms = timed(
+                    lambda: list(build()[:options['page_size']]), options['repeat']
+                )
+                self.stdout.write(
+                    f'count(): {count_ms:.1f} ms   first page: {page_ms:.1f} ms'
+                )
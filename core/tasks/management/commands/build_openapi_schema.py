@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core import schema
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate the OpenAPI schema for the current code and store it in '
+        'OPENAPI_SCHEMA_DIR, where the schema views serve it from.'
+    )
+
+    def handle(self, *args, **options):
+        documents = schema.generate()
+        schema.store(documents)
+        for fmt in documents:
+            self.stdout.write(schema.artifact_path(fmt))
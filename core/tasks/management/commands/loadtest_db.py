@@ -0,0 +1,81 @@
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+
+from tasks.models import Task
+from users.models import User
+from ._bench import seed_tasks, seed_users
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a concurrent task read/update workload against the configured '
+        'database and report throughput. Run it once per DATABASE_URL to compare '
+        'backends, e.g. the SQLite default against the compose Postgres service.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--tasks', type=int, default=2000)
+        parser.add_argument('--write-ratio', type=float, default=0.3)
+
+    def handle(self, *args, **options):
+        admins, users = seed_users(1, 20, prefix='loadtest')
+        try:
+            seed_tasks(options['tasks'], users)
+            task_ids = list(Task.objects.filter(owner_admin=admins[0]).values_list('pk', flat=True))
+            results = self.run_workers(admins[0], task_ids, options)
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in admins + users]).delete()
+        self.report(results, options)
+
+    def run_workers(self, admin, task_ids, options):
+        deadline = time.perf_counter() + options['seconds']
+        results = {'read': [], 'write': [], 'errors': 0}
+        lock = threading.Lock()
+
+        def worker():
+            reads, writes, errors = [], [], 0
+            try:
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        if random.random() < options['write_ratio']:
+                            task = Task.objects.get(pk=random.choice(task_ids))
+                            task.status = random.choice(['PENDING', 'IN_PROGRESS'])
+                            task.save()
+                            writes.append(time.perf_counter() - start)
+                        else:
+                            list(Task.objects.visible_to(admin).with_users()[:50])
+                            reads.append(time.perf_counter() - start)
+                    except DatabaseError:
+                        errors += 1
+            finally:
+                connection.close()
+            with lock:
+                results['read'] += reads
+                results['write'] += writes
+                results['errors'] += errors
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def report(self, results, options):
+        self.stdout.write(f"{connection.vendor}, {options['threads']} threads, {options['seconds']}s")
+        for kind in ('read', 'write'):
+            latencies = sorted(results[kind])
+            if not latencies:
+                continue
+            p50 = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[int(len(latencies) * 0.99)] * 1000
+            rate = len(latencies) / options['seconds']
+            self.stdout.write(f'{kind:>6}: {rate:8.1f} ops/s   p50 {p50:6.1f} ms   p99 {p99:6.1f} ms')
+        self.stdout.write(f"errors: {results['errors']}")
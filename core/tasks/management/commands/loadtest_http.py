@@ -0,0 +1,92 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Hammer the sync and async task list endpoints of a running server with '
+        'concurrent keep-alive connections and compare throughput and latency. '
+        'Start the server first, e.g. gunicorn under uvicorn workers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument('--username', required=True, help='User the JWT is minted for')
+        parser.add_argument('--connections', type=int, default=50)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--paths', nargs='+', default=['/tasks/api-task', '/tasks/api-task/async'])
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']!r}")
+        token = str(RefreshToken.for_user(user).access_token)
+        target = urlsplit(options['url'])
+
+        self.stdout.write(f"{options['connections']} connections, {options['seconds']}s per endpoint")
+        for path in options['paths']:
+            results = asyncio.run(self.run(target, path, token, options))
+            self.report(path, results, options['seconds'])
+
+    async def run(self, target, path, token, options):
+        deadline = time.perf_counter() + options['seconds']
+        request = (
+            f'GET {path} HTTP/1.1\r\n'
+            f'Host: {target.netloc}\r\n'
+            f'Authorization: Bearer {token}\r\n'
+            f'Connection: keep-alive\r\n\r\n'
+        ).encode()
+        results = {'latencies': [], 'errors': 0}
+
+        async def client():
+            reader, writer = await asyncio.open_connection(target.hostname, target.port or 80)
+            try:
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    writer.write(request)
+                    status = await self.read_response(reader)
+                    if status == 200:
+                        results['latencies'].append(time.perf_counter() - start)
+                    else:
+                        results['errors'] += 1
+            finally:
+                writer.close()
+
+        await asyncio.gather(*(client() for _ in range(options['connections'])))
+        return results
+
+    async def read_response(self, reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise CommandError('Server closed the connection')
+        headers = {}
+        while (line := await reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if 'content-length' in headers:
+            await reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding') == 'chunked':
+            while size := int((await reader.readline()).strip(), 16):
+                await reader.readexactly(size + 2)
+            await reader.readline()
+        return int(status_line.split()[1])
+
+    def report(self, path, results, seconds):
+        latencies = sorted(results['latencies'])
+        if not latencies:
+            self.stdout.write(f"{path}: no successful requests, {results['errors']} errors")
+            return
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        rate = len(latencies) / seconds
+        self.stdout.write(
+            f"{path:>24}: {rate:8.1f} req/s   p50 {p50:6.1f} ms   p99 {p99:6.1f} ms   "
+            f"errors {results['errors']}"
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import counters
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the dashboard task counters from scratch and verify them against live aggregates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only compare stored counters with live aggregates; do not rewrite them.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            rows = counters.rebuild()
+            self.stdout.write(f'Rebuilt {rows} counter rows.')
+
+        mismatches = counters.find_mismatches()
+        for (scope, user_id), stored, live in mismatches:
+            self.stdout.write(f'{scope} {user_id}: stored {stored} != live {live}')
+        if mismatches:
+            raise CommandError(f'{len(mismatches)} counter rows disagree with live aggregates.')
+        self.stdout.write(self.style.SUCCESS('Counters match live aggregates.'))
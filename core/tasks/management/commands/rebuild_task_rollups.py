@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tasks import rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily analytics rollups from the completed tasks.'
+
+    def handle(self, *args, **options):
+        rows = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} rollup rows.'))
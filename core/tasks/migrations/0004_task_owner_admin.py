@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_owner_admin(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    User = apps.get_model('users', 'User')
+    Task.objects.update(
+        owner_admin_id=models.Subquery(
+            User.objects.filter(pk=models.OuterRef('assigned_to_id')).values('admin_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0003_alter_task_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='owner_admin',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='owned_tasks', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_owner_admin, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,95 @@
+from django.db import migrations
+
+# A frozen copy of the tasks.search DDL as of this migration
+
+
+def fts_row(row):
+    return (
+        f"{row}.id, {row}.title, {row}.description, {row}.completion_report, "
+        f"trim(coalesce('o' || {row}.owner_admin_id, '') || ' ' "
+        f"|| coalesce('b' || {row}.assigned_by_id, '') || ' ' || 'u' || {row}.assigned_to_id)"
+    )
+
+
+FTS_COLUMNS = 'rowid, title, description, completion_report, scopes'
+
+SQLITE_INDEX = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_task_fts USING fts5(
+        title, description, completion_report, scopes,
+        content='', tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts({FTS_COLUMNS}) VALUES ({fts_row('new')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, {FTS_COLUMNS}) VALUES ('delete', {fts_row('old')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_update AFTER UPDATE ON tasks_task
+    WHEN old.title IS NOT new.title
+        OR old.description IS NOT new.description
+        OR old.completion_report IS NOT new.completion_report
+        OR old.owner_admin_id IS NOT new.owner_admin_id
+        OR old.assigned_by_id IS NOT new.assigned_by_id
+        OR old.assigned_to_id IS NOT new.assigned_to_id
+    BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, {FTS_COLUMNS}) VALUES ('delete', {fts_row('old')});
+        INSERT INTO tasks_task_fts({FTS_COLUMNS}) VALUES ({fts_row('new')});
+    END
+    """,
+    f"INSERT INTO tasks_task_fts({FTS_COLUMNS}) SELECT {fts_row('tasks_task')} FROM tasks_task",
+]
+
+POSTGRES_INDEX = [
+    """
+    ALTER TABLE tasks_task ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(completion_report, '')), 'C')
+    ) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS tasks_task_search_vector_idx
+    ON tasks_task USING gin (search_vector)
+    """,
+]
+
+SQLITE_REMOVE = [
+    'DROP TRIGGER IF EXISTS tasks_task_fts_insert',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_delete',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_update',
+    'DROP TABLE IF EXISTS tasks_task_fts',
+]
+
+POSTGRES_REMOVE = [
+    'DROP INDEX IF EXISTS tasks_task_search_vector_idx',
+    'ALTER TABLE tasks_task DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_tasks_task_status_9c6008_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE_INDEX, 'postgresql': POSTGRES_INDEX}),
+            run({'sqlite': SQLITE_REMOVE, 'postgresql': POSTGRES_REMOVE}),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:40
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def backfill_rollups(apps, schema_editor):
+    # A frozen copy of tasks.rollups.rebuild() as of this migration
+    Task = apps.get_model('tasks', 'Task')
+    TaskRollup = apps.get_model('tasks', 'TaskRollup')
+    totals = defaultdict(lambda: {'completed': 0, 'worked_hours': Decimal(0), 'completion_seconds': 0})
+    tasks = Task.objects.filter(status='COMPLETED', completed_at__isnull=False).values_list(
+        'assigned_to_id', 'owner_admin_id', 'created_at', 'completed_at', 'worked_hours'
+    ).iterator(chunk_size=2000)
+    for assigned_to_id, owner_admin_id, created_at, completed_at, worked_hours in tasks:
+        day = timezone.localdate(completed_at)
+        seconds = max(0, int((completed_at - created_at).total_seconds()))
+        scopes = [('GLOBAL', None), ('USER', assigned_to_id)]
+        if owner_admin_id:
+            scopes.append(('ADMIN', owner_admin_id))
+        for scope, user_id in scopes:
+            row = totals[(scope, user_id, day)]
+            row['completed'] += 1
+            row['worked_hours'] += worked_hours or Decimal(0)
+            row['completion_seconds'] += seconds
+    TaskRollup.objects.bulk_create([
+        TaskRollup(scope=scope, user_id=user_id, day=day, **amounts)
+        for (scope, user_id, day), amounts in totals.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0008_task_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('USER', 'User'), ('ADMIN', 'Admin'), ('GLOBAL', 'Global')], max_length=10)),
+                ('day', models.DateField()),
+                ('completed', models.IntegerField(default=0)),
+                ('worked_hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('completion_seconds', models.BigIntegerField(default=0)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='task_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='taskrollup',
+            constraint=models.UniqueConstraint(fields=('scope', 'user', 'day'), name='unique_task_rollup'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('scope', 'day'), name='unique_global_task_rollup'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
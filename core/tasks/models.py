@@ -1,8 +1,54 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q
 from django.conf import settings
 from utils.models import BaseModel
+from users.models import User
 
 
+class TaskQuerySet(models.QuerySet):
+    USER_RELATIONS = ('assigned_to', 'assigned_by', 'created_by', 'updated_by')
+
+    def visible_to(self, user):
+        """Tasks the given user may see, filtered on indexed task columns only"""
+        if user.role == 'SUPERADMIN':
+            return self.all()
+        if user.role == 'ADMIN':
+            return self.filter(Q(owner_admin=user) | Q(assigned_by=user))
+        if user.role == 'USER':
+            return self.filter(assigned_to=user)
+        return self.none()
+
+    def reportable_by(self, user):
+        """Completed tasks whose report the user may read, mirroring Task.can_view_report"""
+        queryset = self.filter(status='COMPLETED')
+        if user.role in ['SUPERADMIN', 'ADMIN']:
+            return queryset
+        return queryset.filter(assigned_to=user)
+    
+    # Loaded whatever a response shows: keyset pagination, visibility and
+    # ownership checks and the ETag read them
+    ALWAYS_LOADED = ('id', 'created_at', 'assigned_to', 'assigned_by', 'owner_admin', 'version')
+
+    def with_users(self, paths=None):
+        """
+        Join the related users, loading only the username TaskSerializer reads.
+        `paths` narrows the load to those fields and `<relation>__username`
+        lookups, plus ALWAYS_LOADED; only the relations it names are joined.
+        """
+        if paths is None:
+            paths = [
+                *(field.name for field in self.model._meta.concrete_fields),
+                *(f'{relation}__username' for relation in self.USER_RELATIONS),
+            ]
+        queryset = self.only(*self.ALWAYS_LOADED, *paths)
+        relations = {path.split('__')[0] for path in paths if '__' in path}
+        # select_related() without arguments would follow every foreign key
+        return queryset.select_related(*relations) if relations else queryset
+
+
+class TaskVersionConflict(Exception):
+    """A conditional save found the task at a different version than expected"""
+
 
 class Task(BaseModel):
     STATUS_CHOICES = (
@@ -30,26 +76,258 @@ class Task(BaseModel):
     completion_report = models.TextField(blank=True)
     worked_hours = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+    # Denormalized assigned_to.admin so admin visibility needs no join.
+    # Kept in sync here on save and by tasks.signals when User.admin changes.
+    owner_admin = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='owned_tasks'
+    )
+    # Incremented by every save; the API's ETag and If-Match compare it
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    objects = TaskQuerySet.as_manager()
     
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
         indexes = [
+            models.Index(fields=['-created_at', '-id']),
             models.Index(fields=['status']),
-            models.Index(fields=['assigned_to']),
+            # Covers count() and max(updated_at) over one assignee's tasks
+            models.Index(fields=['assigned_to', 'updated_at']),
             models.Index(fields=['due_date']),
+            models.Index(fields=['status', 'completed_at']),
+            models.Index(fields=['updated_at']),
         ]
     
     def __str__(self):
         return f"{self.title} - {self.get_status_display()}"
     
-    def save(self, *args, **kwargs):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+    
+    def _remember_loaded_values(self):
+        """Snapshot the stored row so save() can tell what changed"""
+        self._loaded_values = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+    
+    def set_completed_at(self):
         if self.status == 'COMPLETED' and not self.completed_at:
             from django.utils import timezone
             self.completed_at = timezone.now()
-        super().save(*args, **kwargs)
+    
+    def save(self, *args, expected_version=None, **kwargs):
+        """
+        With `expected_version`, the row is only updated if it is still at that
+        version, in the same UPDATE statement; otherwise TaskVersionConflict
+        is raised and nothing is written.
+        """
+        self.set_completed_at()
+        loaded_values = getattr(self, '_loaded_values', {})
+        extra_fields = {'version'}
+        if self.assigned_to_id != loaded_values.get('assigned_to_id'):
+            self.owner_admin_id = User.objects.filter(
+                pk=self.assigned_to_id
+            ).values_list('admin_id', flat=True).first()
+            extra_fields.add('owner_admin')
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *extra_fields}
+        
+        version = self.version
+        if not self._state.adding and expected_version is not None:
+            self.version = expected_version + 1
+        self._expected_version = expected_version
+        try:
+            # The UPDATE and the read of the version it wrote share a
+            # transaction; a conflict only rolls back this save, not the
+            # caller's transaction
+            with transaction.atomic(using=kwargs.get('using'), savepoint=expected_version is not None):
+                super().save(*args, **kwargs)
+        except TaskVersionConflict:
+            self.version = version
+            raise
+        finally:
+            del self._expected_version
+        self._remember_loaded_values()
+    
+    def delete(self, *args, **kwargs):
+        # The delete signals subtract the row as stored, which a bulk UPDATE
+        # (such as an admin move) may have changed since this was loaded
+        stored = Task._base_manager.using(kwargs.get('using') or self._state.db).filter(
+            pk=self.pk
+        ).values(*(field.attname for field in self._meta.concrete_fields)).first()
+        if stored is not None:
+            self._loaded_values = stored
+        return super().delete(*args, **kwargs)
+    
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        expected_version = getattr(self, '_expected_version', None)
+        if expected_version is None:
+            # Increment the stored version rather than the one this instance
+            # loaded, so two saves never leave different rows at one version
+            values = [
+                (field, model, F('version') + 1 if field.attname == 'version' else value)
+                for field, model, value in values
+            ]
+            if not super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update):
+                return False
+            self.version = base_qs.filter(pk=pk_val).values_list('version', flat=True).get()
+            return True
+        if not super()._do_update(
+            base_qs.filter(version=expected_version), using, pk_val, values, update_fields, forced_update
+        ):
+            raise TaskVersionConflict(f'Task {pk_val} is no longer at version {expected_version}')
+        return True
+    
+    def is_visible_to(self, user):
+        """Instance counterpart of TaskQuerySet.visible_to"""
+        if user.role == 'SUPERADMIN':
+            return True
+        if user.role == 'ADMIN':
+            return user.pk in (self.owner_admin_id, self.assigned_by_id)
+        if user.role == 'USER':
+            return user.pk == self.assigned_to_id
+        return False
     
     def can_view_report(self, user):
         """Check if user can view the completion report"""
         if user.role in ['SUPERADMIN', 'ADMIN']:
             return True
-        return user == self.assigned_to
\ No newline at end of file
+        return user.pk == self.assigned_to_id
+
+
+class TaskCounter(models.Model):
+    """Materialized task totals for one assignee, one admin's scope or everything"""
+    SCOPE_CHOICES = (
+        ('USER', 'User'),
+        ('ADMIN', 'Admin'),
+        ('GLOBAL', 'Global'),
+    )
+    
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='task_counters'
+    )
+    pending = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    worked_hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Overdue depends on the date as well as on writes, so it is only
+    # maintained incrementally while overdue_as_of is today.
+    overdue = models.IntegerField(default=0)
+    overdue_as_of = models.DateField(null=True, blank=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'user'], name='unique_task_counter'),
+            models.UniqueConstraint(
+                fields=['scope'], condition=Q(user__isnull=True), name='unique_global_task_counter'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.scope} {self.user_id or ''} - {self.total} tasks"
+    
+    @property
+    def total(self):
+        return self.pending + self.in_progress + self.completed
+
+
+class TaskRollup(models.Model):
+    """Completed-task totals for one day, for one assignee, one admin's team or everything"""
+    SCOPE_CHOICES = (
+        ('USER', 'User'),
+        ('ADMIN', 'Admin'),
+        ('GLOBAL', 'Global'),
+    )
+    
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='task_rollups'
+    )
+    day = models.DateField()
+    completed = models.IntegerField(default=0)
+    worked_hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Sum of completed_at - created_at over the day's completions
+    completion_seconds = models.BigIntegerField(default=0)
+    
+    class Meta:
+        # The unique index also serves (scope, user, day range) chart queries
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'user', 'day'], name='unique_task_rollup'),
+            models.UniqueConstraint(
+                fields=['scope', 'day'], condition=Q(user__isnull=True),
+                name='unique_global_task_rollup'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.scope} {self.user_id or ''} {self.day} - {self.completed} completed"
+    
+    @property
+    def average_completion_seconds(self):
+        return self.completion_seconds / self.completed if self.completed else None
+
+
+class TaskNotification(models.Model):
+    """A due-soon or overdue notice for one task and recipient, recorded by tasks.scanner"""
+    KIND_CHOICES = (
+        ('DUE_SOON', 'Due Soon'),
+        ('OVERDUE', 'Overdue'),
+    )
+    
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='notifications')
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='task_notifications'
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # The due date being notified about; moving the deadline earns a new notice
+    due_date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['task', 'recipient', 'kind', 'due_date'], name='unique_task_notification'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['recipient', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()}: task {self.task_id} for user {self.recipient_id}"
+
+
+class ScanWatermark(models.Model):
+    """How far a periodic task scan has got, so the next run starts from there"""
+    name = models.CharField(max_length=50, unique=True)
+    # Due dates up to these have been scanned for each notice kind
+    due_soon_through = models.DateField(null=True, blank=True)
+    overdue_through = models.DateField(null=True, blank=True)
+    # Tasks written after this instant are rescanned whatever their due date
+    changed_since = models.DateTimeField(null=True, blank=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.name} through {self.due_soon_through}"
@@ -0,0 +1,174 @@
+"""
+Daily TaskRollup rows behind the analytics endpoint.
+
+A completed task counts towards the day of its completed_at, for its
+assignee (USER scope), its assignee's admin (ADMIN scope, from owner_admin)
+and the GLOBAL row. Writes apply the difference between the old and the new
+contribution with F() updates, so only moves into or out of COMPLETED, and
+edits to completed tasks, touch the table.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task, TaskRollup
+
+ROLLUP_FIELDS = ('completed', 'worked_hours', 'completion_seconds')
+TRACKED_FIELDS = (
+    'status', 'created_at', 'completed_at', 'worked_hours',
+    'assigned_to_id', 'owner_admin_id',
+)
+
+
+def _normalize(values):
+    values['worked_hours'] = Task._meta.get_field('worked_hours').to_python(values['worked_hours'])
+    return values
+
+
+def task_values(task):
+    return _normalize({attname: getattr(task, attname) for attname in TRACKED_FIELDS})
+
+
+def stored_values(task):
+    """Tracked values as last loaded from or written to the database, if known"""
+    loaded = getattr(task, '_loaded_values', {})
+    if all(attname in loaded for attname in TRACKED_FIELDS):
+        return _normalize({attname: loaded[attname] for attname in TRACKED_FIELDS})
+    return None
+
+
+def contribution(values):
+    """(day, amounts) a task adds to its rollups, or None unless it is completed"""
+    if values['status'] != 'COMPLETED' or values['completed_at'] is None:
+        return None
+    latency = values['completed_at'] - values['created_at']
+    return timezone.localdate(values['completed_at']), {
+        'completed': 1,
+        'worked_hours': values['worked_hours'] or Decimal(0),
+        'completion_seconds': max(0, int(latency.total_seconds())),
+    }
+
+
+def rollup_scopes(values):
+    scopes = [('GLOBAL', None), ('USER', values['assigned_to_id'])]
+    if values['owner_admin_id']:
+        scopes.append(('ADMIN', values['owner_admin_id']))
+    return scopes
+
+
+def accumulate(changes):
+    """Net amounts per (scope, user_id, day) for (old, new) value pairs"""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for old, new in changes:
+        for values, sign in ((old, -1), (new, 1)):
+            share = values and contribution(values)
+            if not share:
+                continue
+            day, amounts = share
+            for scope, user_id in rollup_scopes(values):
+                for field, amount in amounts.items():
+                    deltas[(scope, user_id, day)][field] += sign * amount
+    return deltas
+
+
+def record_save(task, created):
+    new = task_values(task)
+    old = None if created else stored_values(task)
+    if old is None and not created:
+        # Unknown previous row: rebuild the days we can see from live data
+        share = contribution(new)
+        if share:
+            for scope, user_id in rollup_scopes(new):
+                refresh_rollup(scope, user_id, share[0])
+        return
+    apply_changes([(old, new)])
+
+
+def record_delete(task):
+    # Never create rows here: during a cascading user delete the rollup's
+    # own user may be about to disappear, and a removal has nothing to add
+    apply_changes([(stored_values(task) or task_values(task), None)], create_missing=False)
+
+
+def apply_changes(changes, create_missing=True):
+    """Apply many (old, new) pairs with one UPDATE per affected rollup row"""
+    for (scope, user_id, day), delta in accumulate(changes).items():
+        delta = {field: amount for field, amount in delta.items() if amount}
+        if delta:
+            _apply_delta(scope, user_id, day, delta, create_missing)
+
+
+def _apply_delta(scope, user_id, day, delta, create_missing):
+    rows = TaskRollup.objects.filter(scope=scope, user_id=user_id, day=day)
+    increments = {field: F(field) + amount for field, amount in delta.items()}
+    if rows.update(**increments) or not create_missing:
+        return
+    try:
+        with transaction.atomic():
+            TaskRollup.objects.create(scope=scope, user_id=user_id, day=day, **delta)
+    except IntegrityError:
+        # A concurrent writer created the row first
+        rows.update(**increments)
+
+
+def scope_queryset(scope, user_id):
+    completed = Task.objects.filter(status='COMPLETED', completed_at__isnull=False)
+    if scope == 'USER':
+        return completed.filter(assigned_to_id=user_id)
+    if scope == 'ADMIN':
+        return completed.filter(owner_admin_id=user_id)
+    return completed
+
+
+def refresh_rollup(scope, user_id, day):
+    """Recompute one rollup row from the task table"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    tasks = scope_queryset(scope, user_id).filter(
+        completed_at__gte=start, completed_at__lt=start + timedelta(days=1)
+    ).values(*TRACKED_FIELDS)
+    amounts = accumulate((None, values) for values in tasks).get((scope, user_id, day), {})
+    TaskRollup.objects.update_or_create(
+        scope=scope, user_id=user_id, day=day,
+        defaults={field: amounts.get(field, 0) for field in ROLLUP_FIELDS}
+    )
+
+
+def rebuild():
+    """Replace every rollup row with totals from the task table; returns the row count"""
+    tasks = scope_queryset('GLOBAL', None).values(*TRACKED_FIELDS).iterator(chunk_size=2000)
+    deltas = accumulate((None, values) for values in tasks)
+    with transaction.atomic():
+        TaskRollup.objects.all().delete()
+        TaskRollup.objects.bulk_create([
+            TaskRollup(scope=scope, user_id=user_id, day=day, **amounts)
+            for (scope, user_id, day), amounts in deltas.items()
+        ], batch_size=1000)
+    return len(deltas)
+
+
+def series(scope, user_id, start, end, interval='day'):
+    """Rollup totals from `start` to `end` inclusive, one entry per day or month"""
+    rows = TaskRollup.objects.filter(
+        scope=scope, user_id=user_id, day__gte=start, day__lte=end
+    ).order_by('day').values('day', *ROLLUP_FIELDS)
+
+    periods = {}
+    for row in rows:
+        period = row['day'].replace(day=1) if interval == 'month' else row['day']
+        totals = periods.setdefault(period, dict.fromkeys(ROLLUP_FIELDS, 0))
+        for field in ROLLUP_FIELDS:
+            totals[field] += row[field]
+
+    return [{
+        'period': period,
+        'completed': totals['completed'],
+        'worked_hours': totals['worked_hours'],
+        'average_completion_hours': (
+            round(totals['completion_seconds'] / totals['completed'] / 3600, 2)
+            if totals['completed'] else None
+        ),
+    } for period, totals in periods.items()]
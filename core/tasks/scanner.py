@@ -0,0 +1,102 @@
+"""
+Periodic scan for open tasks that are due soon or overdue.
+
+A run never rereads the whole table. A ScanWatermark remembers which due
+dates have been covered for each notice kind, so a run only walks the
+due_date index over the days that entered a window since the previous run.
+Tasks written since the previous run (found through the updated_at index)
+are checked as well, which catches tasks created or rescheduled into days
+already covered. Notices are recorded as TaskNotification rows; the unique
+constraint makes overlapping or repeated runs harmless.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ScanWatermark, Task, TaskNotification
+
+WATERMARK_NAME = 'due-tasks'
+# A write can commit a little after the updated_at it was stamped with
+CHANGE_OVERLAP = timedelta(minutes=5)
+ROW_FIELDS = ('id', 'due_date', 'updated_at', 'assigned_to_id', 'owner_admin_id')
+
+
+def scan(days=None, batch_size=1000, now=None):
+    """Record notices for tasks that entered a window since the last run; returns a cost report"""
+    days = settings.TASK_DUE_SOON_DAYS if days is None else days
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    horizon = today + timedelta(days=days)
+    report = {'scanned': 0, 'notices': 0, 'batches': 0}
+
+    start = time.perf_counter()
+    watermark, _ = ScanWatermark.objects.get_or_create(name=WATERMARK_NAME)
+    open_tasks = Task.objects.exclude(status='COMPLETED')
+
+    # Due today or later and not yet covered
+    covered = today - timedelta(days=1)
+    if watermark.due_soon_through:
+        covered = max(covered, watermark.due_soon_through)
+    ranges = [(open_tasks.filter(due_date__gt=covered, due_date__lte=horizon), 'due_date')]
+    # Overdue since the last run; the first run takes all of the backlog
+    overdue = open_tasks.filter(due_date__lt=today)
+    if watermark.overdue_through:
+        overdue = overdue.filter(due_date__gt=watermark.overdue_through)
+    ranges.append((overdue, 'due_date'))
+    if watermark.changed_since:
+        ranges.append((open_tasks.filter(
+            updated_at__gte=watermark.changed_since - CHANGE_OVERLAP, due_date__lte=horizon
+        ), 'updated_at'))
+
+    for queryset, field in ranges:
+        for rows in keyset_batches(queryset, field, batch_size):
+            report['scanned'] += len(rows)
+            report['batches'] += 1
+            report['notices'] += record_notices(rows, today)
+
+    watermark.due_soon_through = max(horizon, watermark.due_soon_through or horizon)
+    watermark.overdue_through = today - timedelta(days=1)
+    watermark.changed_since = now
+    watermark.last_run_at = now
+    watermark.save()
+
+    report['ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return report
+
+
+def keyset_batches(queryset, field, batch_size):
+    """Rows of `queryset` as ROW_FIELDS dicts, walking the (field, id) order in batches"""
+    position = None
+    while True:
+        batch = queryset
+        if position is not None:
+            value, pk = position
+            batch = batch.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': pk}))
+        rows = list(batch.order_by(field, 'id').values(*ROW_FIELDS)[:batch_size])
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size:
+            return
+        position = (rows[-1][field], rows[-1]['id'])
+
+
+def record_notices(rows, today):
+    """Insert the notices due for `rows`; returns how many were attempted"""
+    notices = []
+    for row in rows:
+        if row['due_date'] < today:
+            kind, recipients = 'OVERDUE', {row['assigned_to_id'], row['owner_admin_id']}
+        else:
+            kind, recipients = 'DUE_SOON', {row['assigned_to_id']}
+        notices += [
+            TaskNotification(
+                task_id=row['id'], recipient_id=recipient, kind=kind, due_date=row['due_date']
+            )
+            for recipient in recipients - {None}
+        ]
+    TaskNotification.objects.bulk_create(notices, ignore_conflicts=True)
+    return len(notices)
@@ -0,0 +1,205 @@
+"""
+Full-text search over task title, description and completion report.
+
+SQLite uses a contentless FTS5 table, tasks_task_fts, filled by triggers on
+tasks_task. Besides the text it indexes scope tokens (o<owner_admin_id>,
+b<assigned_by_id>, u<assigned_to_id>) so that visibility is resolved inside
+the index. PostgreSQL uses a stored generated tsvector column,
+tasks_task.search_vector, with a GIN index. Either way the database keeps the
+index in step with every write, including bulk_create(), bulk_update() and
+queryset.update(), which never reach Task.save().
+
+Scoring every match of a common word grows with the table, so only the
+newest TASK_SEARCH_WINDOW visible matches are ranked. Other backends fall
+back to unranked substring matching, newest first.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import FloatField, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .counters import viewer_scope
+
+FTS_TABLE = 'tasks_task_fts'
+# Column weights, in the order title, description, completion_report, scopes
+WEIGHTS = (10.0, 2.0, 1.0, 0.0)
+
+
+def _fts_row(row):
+    scopes = (
+        f"trim(coalesce('o' || {row}.owner_admin_id, '') || ' ' "
+        f"|| coalesce('b' || {row}.assigned_by_id, '') || ' ' || 'u' || {row}.assigned_to_id)"
+    )
+    return f'{row}.id, {row}.title, {row}.description, {row}.completion_report, {scopes}'
+
+
+FTS_COLUMNS = 'rowid, title, description, completion_report, scopes'
+
+SQLITE_INDEX = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, completion_report, scopes,
+        content='', tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_COLUMNS}) VALUES ({_fts_row('new')});
+    END
+    """,
+    # A contentless table is told the exact values being removed
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, {FTS_COLUMNS}) VALUES ('delete', {_fts_row('old')});
+    END
+    """,
+    # Status and audit updates leave the index alone
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE ON tasks_task
+    WHEN old.title IS NOT new.title
+        OR old.description IS NOT new.description
+        OR old.completion_report IS NOT new.completion_report
+        OR old.owner_admin_id IS NOT new.owner_admin_id
+        OR old.assigned_by_id IS NOT new.assigned_by_id
+        OR old.assigned_to_id IS NOT new.assigned_to_id
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, {FTS_COLUMNS}) VALUES ('delete', {_fts_row('old')});
+        INSERT INTO {FTS_TABLE}({FTS_COLUMNS}) VALUES ({_fts_row('new')});
+    END
+    """,
+]
+
+POSTGRES_INDEX = [
+    """
+    ALTER TABLE tasks_task ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(completion_report, '')), 'C')
+    ) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS tasks_task_search_vector_idx
+    ON tasks_task USING gin (search_vector)
+    """,
+]
+
+
+def install(connection):
+    """Create the search index for this backend; safe to run repeatedly"""
+    if 'tasks_task' not in connection.introspection.table_names():
+        return
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE]
+            )
+            created = cursor.fetchone() is None
+            for statement in SQLITE_INDEX:
+                cursor.execute(statement)
+            if created:
+                # Index the rows that already exist
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE}({FTS_COLUMNS}) "
+                    f"SELECT {_fts_row('tasks_task')} FROM tasks_task"
+                )
+    elif connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            for statement in POSTGRES_INDEX:
+                cursor.execute(statement)
+
+
+def uninstall(connection):
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            for suffix in ('insert', 'delete', 'update'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    elif connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX IF EXISTS tasks_task_search_vector_idx')
+            cursor.execute('ALTER TABLE tasks_task DROP COLUMN IF EXISTS search_vector')
+
+
+def search_terms(text):
+    """Words of the user's input; operators and punctuation are dropped"""
+    return re.findall(r'\w+', text)
+
+
+def search(queryset, text, user):
+    """
+    Tasks in `queryset` matching every word of `text`, best match first,
+    with the score in the `rank` attribute (lower is better). `queryset`
+    must already be limited to what `user` may see.
+    """
+    terms = search_terms(text)
+    scope = viewer_scope(user)
+    if not terms or scope is None:
+        return queryset.none()
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        return _search_sqlite(queryset, terms, scope)
+    if vendor == 'postgresql':
+        return _search_postgresql(queryset, terms)
+    return _search_unindexed(queryset, terms)
+
+
+def _search_sqlite(queryset, terms, scope):
+    # Quoted terms are taken literally by FTS5
+    match = '{title description completion_report} : (%s)' % ' '.join(
+        f'"{term}"' for term in terms
+    )
+    if scope[0] == 'ADMIN':
+        match += f' AND scopes : (o{scope[1]} OR b{scope[1]})'
+    elif scope[0] == 'USER':
+        match += f' AND scopes : u{scope[1]}'
+
+    where = [f'{FTS_TABLE}.rowid = tasks_task.id', f'{FTS_TABLE} MATCH %s']
+    params = [match]
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY rowid DESC LIMIT 1 OFFSET %s',
+            [match, settings.TASK_SEARCH_WINDOW - 1]
+        )
+        oldest = cursor.fetchone()
+    if oldest:
+        where.append(f'{FTS_TABLE}.rowid >= %s')
+        params.append(oldest[0])
+
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        select={'rank': f'bm25({FTS_TABLE}, %s, %s, %s, %s)'},
+        select_params=WEIGHTS,
+        where=where,
+        params=params,
+    ).order_by('rank', '-created_at', '-id')
+
+
+def _search_postgresql(queryset, terms):
+    tsquery = "websearch_to_tsquery('english', %s)"
+    text = ' '.join(terms)
+    matches = queryset.extra(where=[f'search_vector @@ {tsquery}'], params=[text])
+    oldest = matches.order_by('-id').values_list('id', flat=True)[
+        settings.TASK_SEARCH_WINDOW - 1:settings.TASK_SEARCH_WINDOW
+    ]
+    # With fewer matches than the window there is no lower bound
+    return matches.filter(id__gte=Coalesce(Subquery(oldest), 0)).extra(
+        select={'rank': f'-ts_rank(search_vector, {tsquery})'},
+        select_params=[text],
+    ).order_by('rank', '-created_at', '-id')
+
+
+def _search_unindexed(queryset, terms):
+    match = Q()
+    for term in terms:
+        match &= (
+            Q(title__icontains=term) | Q(description__icontains=term)
+            | Q(completion_report__icontains=term)
+        )
+    return queryset.filter(match).annotate(
+        rank=Value(0.0, output_field=FloatField())
+    ).order_by('-created_at', '-id')
@@ -1,28 +1,213 @@
-from rest_framework import serializers
+from datetime import date
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from .models import Task
 from users.models import User
 
 
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField that can resolve a whole batch of keys in one query"""
+    
+    def prefetch(self, values):
+        pks = set()
+        for value in values:
+            try:
+                pks.add(int(value))
+            except (TypeError, ValueError):
+                pass
+        self._prefetched = self.get_queryset().in_bulk(pks)
+    
+    def to_internal_value(self, data):
+        prefetched = getattr(self, '_prefetched', None)
+        if prefetched is not None and not isinstance(data, bool):
+            try:
+                return prefetched[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path for rendering many rows of a ModelSerializer.
+    
+    The serializer's readable fields are compiled once into dict keys,
+    values() lookups and converters; rows are then turned into plain dicts
+    without a model instance or a field traversal per row. The output
+    equals serializer.data for the same rows, including how DRF treats a
+    dotted source whose relation is null. Fields without a known plain
+    representation raise TypeError up front.
+    """
+    # to_representation() of these returns the database value unchanged
+    PLAIN_FIELDS = (
+        serializers.CharField, serializers.ChoiceField,
+        serializers.IntegerField, serializers.PrimaryKeyRelatedField,
+    )
+    CONVERTED_FIELDS = (
+        serializers.DateTimeField, serializers.DateField, serializers.DecimalField,
+    )
+    SKIP, FAIL = object(), object()
+    
+    def __init__(self, serializer):
+        self.columns = []
+        for field in serializer._readable_fields:
+            # A dotted source also reads its relation's key, which tells a
+            # missing relation apart from a null column
+            relation = field.source_attrs[0] if len(field.source_attrs) > 1 else None
+            missing = self.missing_value(field) if relation else None
+            self.columns.append((
+                field, '__'.join(field.source_attrs), self.converter(field), relation, missing
+            ))
+        self.lookups = list(dict.fromkeys(
+            lookup for _, source, _, relation, _ in self.columns for lookup in (relation, source) if lookup
+        ))
+    
+    def converter(self, field):
+        """to_representation() for non-null values, or None when it is the identity"""
+        if isinstance(field, self.PLAIN_FIELDS):
+            return None
+        if not isinstance(field, self.CONVERTED_FIELDS):
+            raise TypeError(f'{type(field).__name__} {field.field_name!r} has no values() form')
+        output_format = getattr(field, 'format', None)
+        if isinstance(field, serializers.DateTimeField):
+            output_format = output_format or api_settings.DATETIME_FORMAT
+            # Resolved once instead of per value, as enforce_timezone() does
+            field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+            if output_format.lower() == ISO_8601 and field_timezone is not None:
+                def convert(value):
+                    value = value.astimezone(field_timezone).isoformat()
+                    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+                return convert
+        elif isinstance(field, serializers.DateField):
+            output_format = output_format or api_settings.DATE_FORMAT
+            if output_format.lower() == ISO_8601:
+                return date.isoformat
+        return field.to_representation
+    
+    def missing_value(self, field):
+        """What DRF renders for `field` when its relation is null"""
+        try:
+            value = field.get_attribute(None)
+        except serializers.SkipField:
+            return self.SKIP
+        except (AttributeError, KeyError):
+            # A required field: DRF fails on such a row, and so will render()
+            return self.FAIL
+        return None if value is None else field.to_representation(value)
+    
+    def to_representation(self, row):
+        data = {}
+        for field, source, convert, relation, missing in self.columns:
+            if relation is not None and row[relation] is None:
+                if missing is self.FAIL:
+                    field.get_attribute(None)
+                if missing is not self.SKIP:
+                    data[field.field_name] = missing
+                continue
+            value = row[source]
+            data[field.field_name] = value if value is None or convert is None else convert(value)
+        return data
+    
+    def render(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+class TaskBulkListSerializer(serializers.ListSerializer):
+    """
+    Validates every row on its own so one bad row does not reject the batch.
+    Valid rows end up in validated_data, their input positions in row_indexes
+    and the failures in row_errors, keyed by position.
+    """
+    
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            message = self.error_messages['not_a_list'].format(input_type=type(data).__name__)
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]})
+        if not data:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [self.error_messages['empty']]})
+        if self.max_length is not None and len(data) > self.max_length:
+            message = self.error_messages['max_length'].format(max_length=self.max_length)
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]})
+        
+        for name, field in self.child.fields.items():
+            if isinstance(field, BulkPrimaryKeyRelatedField) and not field.read_only:
+                field.prefetch(row.get(name) for row in data if isinstance(row, dict))
+        
+        validated = []
+        self.row_indexes = []
+        self.row_errors = {}
+        for index, item in enumerate(data):
+            try:
+                validated.append(self.child.run_validation(item))
+            except serializers.ValidationError as exc:
+                self.row_errors[index] = exc.detail
+            else:
+                self.row_indexes.append(index)
+        return validated
+
+
 class TaskSerializer(serializers.ModelSerializer):
     assigned_to_username = serializers.CharField(source='assigned_to.username', read_only=True)
     assigned_by_username = serializers.CharField(source='assigned_by.username', read_only=True)
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
     updated_by_username = serializers.CharField(source='updated_by.username', read_only=True)
+    assigned_to = BulkPrimaryKeyRelatedField(queryset=User.objects.all())
     
     class Meta:
         model = Task
+        list_serializer_class = TaskBulkListSerializer
         fields = [
             'id', 'title', 'description', 'assigned_to', 'assigned_to_username',
             'assigned_by', 'assigned_by_username', 'due_date', 'status',
             'completion_report', 'worked_hours', 'completed_at',
             'created_at', 'updated_at', 'created_by', 'created_by_username',
-            'updated_by', 'updated_by_username'
+            'updated_by', 'updated_by_username', 'version'
         ]
         read_only_fields = [
             'completed_at', 'created_at', 'updated_at', 
-            'created_by', 'updated_by', 'assigned_by'
+            'created_by', 'updated_by', 'assigned_by', 'version'
         ]
     
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+    
+    @classmethod
+    def select_fields(cls, params):
+        """
+        Field names chosen by ?fields= and ?exclude= (comma-separated), in
+        declaration order and always with id; None when neither is given
+        """
+        selected = {}
+        for param in ('fields', 'exclude'):
+            value = params.get(param)
+            if value is None:
+                continue
+            names = {name.strip() for name in value.split(',') if name.strip()}
+            unknown = names - set(cls.Meta.fields)
+            if unknown:
+                raise serializers.ValidationError(
+                    {param: f'Unknown fields: {", ".join(sorted(unknown))}'}
+                )
+            selected[param] = names
+        if not selected:
+            return None
+        names = selected.get('fields', set(cls.Meta.fields)) - selected.get('exclude', set())
+        return [name for name in cls.Meta.fields if name in names or name == 'id']
+    
+    @classmethod
+    def source_paths(cls, fields):
+        """ORM lookups the given fields read, for TaskQuerySet.with_users()"""
+        paths = []
+        for name in fields:
+            declared = cls._declared_fields.get(name)
+            source = declared.source if declared is not None and declared.source else name
+            paths.append(source.replace('.', '__'))
+        return paths
+    
     def validate(self, data):
         if self.instance and self.instance.status == 'COMPLETED':
             # Prevent modifying completed tasks
@@ -45,6 +230,17 @@ class TaskSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data['assigned_by'] = self.context['request'].user
         return super().create(validated_data)
+    
+    def update(self, instance, validated_data):
+        # Write only the submitted columns, conditional on the version the
+        # view read when the context carries one
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(
+            update_fields=[*validated_data, 'completed_at', 'updated_at', 'updated_by'],
+            expected_version=self.context.get('expected_version'),
+        )
+        return instance
 
 
 class TaskCompletionSerializer(serializers.ModelSerializer):
@@ -65,6 +261,16 @@ class TaskCompletionSerializer(serializers.ModelSerializer):
         return data
 
 
+class TaskStatusUpdateSerializer(TaskCompletionSerializer):
+    """One row of a bulk status transition"""
+    id = serializers.IntegerField()
+    
+    class Meta(TaskCompletionSerializer.Meta):
+        fields = ['id', 'status', 'completion_report', 'worked_hours']
+        extra_kwargs = {'status': {'required': True}}
+        list_serializer_class = TaskBulkListSerializer
+
+
 class TaskReportSerializer(serializers.ModelSerializer):
     assigned_to_username = serializers.CharField(source='assigned_to.username')
     assigned_to_email = serializers.CharField(source='assigned_to.email')
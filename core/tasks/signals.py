@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.db import connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from . import counters, fragments, rollups, search
+from .models import Task
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def sync_task_owner_admin(sender, instance, created, update_fields=None, **kwargs):
+    """Follow User.admin reassignments into Task.owner_admin"""
+    if created or (update_fields is not None and 'admin' not in update_fields):
+        return
+    tasks = Task.objects.filter(assigned_to=instance).exclude(owner_admin_id=instance.admin_id)
+    previous_admins = set(tasks.values_list('owner_admin_id', flat=True).distinct())
+    moved_rollups = [
+        (values, {**values, 'owner_admin_id': instance.admin_id})
+        for values in rollups.scope_queryset('USER', instance.pk).exclude(
+            owner_admin_id=instance.admin_id
+        ).values(*rollups.TRACKED_FIELDS)
+    ]
+    if tasks.update(owner_admin_id=instance.admin_id):
+        # Bulk UPDATE skips the Task signals, so recount the affected admins
+        admin_ids = (previous_admins | {instance.admin_id}) - {None}
+        for admin_id in admin_ids:
+            counters.refresh_counter('ADMIN', admin_id)
+        rollups.apply_changes(moved_rollups)
+        fragments.invalidate(('ADMIN', admin_id) for admin_id in admin_ids)
+
+
+@receiver(post_save, sender=Task)
+def update_task_counters(sender, instance, created, raw=False, **kwargs):
+    # Runs inside Task.save(), before it re-snapshots the stored row
+    if not raw:
+        counters.record_save(instance, created)
+
+
+@receiver(post_delete, sender=Task)
+def release_task_counters(sender, instance, **kwargs):
+    counters.record_delete(instance)
+
+
+@receiver(post_save, sender=Task)
+def update_task_rollups(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        rollups.record_save(instance, created)
+
+
+@receiver(post_delete, sender=Task)
+def release_task_rollups(sender, instance, **kwargs):
+    rollups.record_delete(instance)
+
+
+@receiver(post_save, sender=Task)
+def invalidate_task_tables(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        old = None if created else counters.stored_values(instance)
+        fragments.invalidate_tasks(old, counters.task_values(instance))
+
+
+@receiver(post_delete, sender=Task)
+def invalidate_deleted_task_tables(sender, instance, **kwargs):
+    fragments.invalidate_tasks(counters.stored_values(instance) or counters.task_values(instance))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_assignee_tables(sender, instance, created, update_fields=None, **kwargs):
+    """Task tables show the assignee's username, so renames reach every viewer"""
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    admin_ids = set()
+    for owner_admin_id, assigned_by_id in Task.objects.filter(
+        assigned_to=instance
+    ).values_list('owner_admin_id', 'assigned_by_id').distinct():
+        admin_ids |= {owner_admin_id, assigned_by_id}
+    fragments.invalidate([
+        ('GLOBAL', None), ('USER', instance.pk),
+        *(('ADMIN', admin_id) for admin_id in admin_ids - {None}),
+    ])
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_tables(sender, instance, **kwargs):
+    # Tasks it owned or assigned are detached by SET_NULL, which sends no signals
+    fragments.invalidate([('GLOBAL', None), ('USER', instance.pk), ('ADMIN', instance.pk)])
+
+
+def reinstall_search_index(using, **kwargs):
+    # SQLite migrations that rebuild tasks_task drop its triggers with it
+    search.install(connections[using])
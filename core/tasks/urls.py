@@ -1,7 +1,9 @@
 from django.urls import path
 from .views import (
     TaskListView, TaskDetailView, TaskReportView,
-    admin_dashboard, task_list, task_detail, user_list, admin_list
+    TaskBulkCreateView, TaskBulkStatusView, TaskReportExportView, TaskAnalyticsView,
+    admin_dashboard, task_list, task_detail, user_list, admin_list,
+    task_list_async, task_detail_async, TaskTableCacheStatsView, TaskSearchView
 )
 
 urlpatterns = [
@@ -15,6 +17,14 @@ urlpatterns = [
         # API URLs
     path('api-task', TaskListView.as_view(), name='api-tasks-list'),
     path('api-task/<int:pk>/', TaskDetailView.as_view(), name='api-tasks-detail'),
+    path('api-task/search', TaskSearchView.as_view(), name='api-tasks-search'),
+    path('api-task/async', task_list_async, name='api-tasks-list-async'),
+    path('api-task/async/<int:pk>/', task_detail_async, name='api-tasks-detail-async'),
+    path('api-task/cache-stats', TaskTableCacheStatsView.as_view(), name='api-tasks-cache-stats'),
+    path('api-task/bulk', TaskBulkCreateView.as_view(), name='api-tasks-bulk-create'),
+    path('api-task/bulk-status', TaskBulkStatusView.as_view(), name='api-tasks-bulk-status'),
     path('<int:pk>/report/', TaskReportView.as_view(), name='api-task-report'),
+    path('reports/export/', TaskReportExportView.as_view(), name='api-task-report-export'),
+    path('analytics/', TaskAnalyticsView.as_view(), name='api-task-analytics'),
 
 ]
@@ -1,63 +1,170 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.functional import cached_property
+from django.utils.http import parse_etags, urlencode
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
 from rest_framework import generics, viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
-from .models import Task
-from .serializers import TaskSerializer, TaskCompletionSerializer, TaskReportSerializer
+from rest_framework.exceptions import APIException, NotAuthenticated, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
+from rest_framework.views import APIView
+from . import bulk, counters, fragments, rollups, search
+from .models import Task, TaskVersionConflict
+from .pagination import TaskCursorPagination, TaskSearchPagination
+from .serializers import (
+    TaskSerializer, TaskCompletionSerializer, TaskReportSerializer,
+    TaskStatusUpdateSerializer, ValuesSerializer
+)
 from users.models import User
+from utils.authentication import CachedJWTAuthentication
+from utils.conditional import (
+    ConditionalListMixin, ConditionalRetrieveMixin, make_etag, usernames_version
+)
 from utils.permissions import (
     IsAdmin, IsUser, IsTaskOwner, 
-    IsAdminOrTaskOwner, IsSuperAdmin
+    IsAdminOrTaskOwner, IsSuperAdmin, get_access
 )
 
 
 # API Views
-class TaskListView(generics.ListCreateAPIView):
+class SparseFieldsMixin:
+    """?fields= and ?exclude= narrow GET responses and the columns they load"""
+    
+    @cached_property
+    def sparse_fields(self):
+        if self.request.method not in SAFE_METHODS:
+            return None
+        return TaskSerializer.select_fields(self.request.query_params)
+    
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            # Schema generation runs without a user
+            return Task.objects.none()
+        paths = self.sparse_fields and TaskSerializer.source_paths(self.sparse_fields)
+        return Task.objects.visible_to(self.request.user).with_users(paths)
+    
+    def get_serializer(self, *args, **kwargs):
+        if self.sparse_fields is not None:
+            kwargs['fields'] = self.sparse_fields
+        return super().get_serializer(*args, **kwargs)
+
+
+class ValuesListMixin:
+    """Lists are rendered by ValuesSerializer from values() rows"""
+    # Read by the paginators whatever the serializer shows
+    values_required = ('id', 'created_at')
+    
+    def list(self, request, *args, **kwargs):
+        rows = ValuesSerializer(self.get_serializer())
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *dict.fromkeys([*self.values_required, *rows.lookups])
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.render(page))
+        return Response(rows.render(queryset))
+
+
+class TaskListView(SparseFieldsMixin, ConditionalListMixin, ValuesListMixin, generics.ListCreateAPIView):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = TaskCursorPagination
     
-    def get_queryset(self):
-        user = self.request.user
-        if user.role == 'USER':
-            return Task.objects.filter(assigned_to=user)
-        elif user.role == 'ADMIN':
-            return Task.objects.filter(
-                assigned_to__admin=user
-            ) | Task.objects.filter(assigned_by=user)
-        elif user.role == 'SUPERADMIN':
-            return Task.objects.all()
-        return Task.objects.none()
+    # Aggregated over the visible rows themselves, never the TaskCounter
+    # totals, so a drifted counter cannot hide a change
+    validator_fields = ('updated_at', 'version')
+    
+    def get_list_etag(self, queryset):
+        # Responses also show the usernames of the users tasks point at
+        return make_etag(super().get_list_etag(queryset), usernames_version())
     
     def perform_create(self, serializer):
-        if self.request.user.role == 'USER':
+        if get_access(self.request).is_regular_user:
             raise PermissionDenied("Users cannot create tasks")
         serializer.save()
 
 
-class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TaskSearchView(TaskListView):
+    """
+    Ranked full-text search over the tasks the user may see: ?q=words.
+
+    Only the newest TASK_SEARCH_WINDOW (1000 by default) matching tasks are
+    ranked and returned. An older task is left out however well it matches,
+    so a common word may need more words to reach it.
+    """
+    http_method_names = ['get', 'head', 'options']
+    pagination_class = TaskSearchPagination
+    
+    def get_list_etag(self, queryset):
+        # Validating would run the match a second time
+        return None
+    
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Task.objects.none()
+        text = self.request.query_params.get('q', '').strip()
+        if not text:
+            raise ValidationError({'q': 'This field is required.'})
+        return search.search(super().get_queryset(), text, self.request.user)
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The task has changed since it was read.'
+    default_code = 'precondition_failed'
+
+
+def task_etag(task):
+    """The row version, and the version of the usernames the response shows"""
+    return f'"{task.version}.{usernames_version()}"'
+
+
+class TaskDetailView(SparseFieldsMixin, ConditionalRetrieveMixin, generics.RetrieveUpdateDestroyAPIView):
+    """
+    Responses carry the task version as a strong ETag. GET honours
+    If-None-Match; an update sent with If-Match is applied in one UPDATE
+    conditional on that version and answered with 412 if the task has
+    changed in the meantime.
+    """
     serializer_class = TaskSerializer
     permission_classes = [IsAdminOrTaskOwner]
     
-    def get_queryset(self):
-        user = self.request.user
-        if user.role == 'USER':
-            return Task.objects.filter(assigned_to=user)
-        elif user.role == 'ADMIN':
-            return Task.objects.filter(assigned_to__admin=user) | Task.objects.filter(assigned_by=user)
-        elif user.role == 'SUPERADMIN':
-            return Task.objects.all()
-        return Task.objects.none()
+    def get_expected_version(self, task):
+        """The version If-Match pins the update to, or None without the header"""
+        header = self.request.headers.get('If-Match')
+        if header is None:
+            return None
+        etags = parse_etags(header)
+        if '*' not in etags and task_etag(task) not in etags:
+            raise PreconditionFailed()
+        return task.version
+    
+    def get_object_etag(self, task):
+        return task_etag(task)
     
     def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
         task = self.get_object()
+        access = get_access(request)
         
-        if request.user.role == 'USER' and task.assigned_to != request.user:
+        if access.is_regular_user and not access.owns(task):
             raise PermissionDenied("You can only update your own tasks")
         
-        if request.user.role == 'USER':
+        if access.is_regular_user:
             allowed_fields = ['status', 'completion_report', 'worked_hours']
             for field in request.data:
                 if field not in allowed_fields:
@@ -78,7 +185,83 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
                         status=status.HTTP_400_BAD_REQUEST
                     )
         
-        return super().update(request, *args, **kwargs)
+        serializer = self.get_serializer(task, data=request.data, partial=partial)
+        serializer.context['expected_version'] = self.get_expected_version(task)
+        serializer.is_valid(raise_exception=True)
+        try:
+            self.perform_update(serializer)
+        except TaskVersionConflict:
+            raise PreconditionFailed()
+        response = Response(serializer.data)
+        response['ETag'] = task_etag(task)
+        return response
+
+
+def bulk_response(results, row_errors, success_status):
+    """201/200 when every row succeeded, 207 when some did, 400 when none did"""
+    if not row_errors:
+        response_status = success_status
+    elif results:
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_400_BAD_REQUEST
+    errors = [{'index': index, 'errors': errors} for index, errors in sorted(row_errors.items())]
+    return Response({'results': results, 'errors': errors}, status=response_status)
+
+
+class TaskBulkCreateView(generics.GenericAPIView):
+    serializer_class = TaskSerializer
+    permission_classes = [IsAdmin]
+    max_rows = 5000
+    
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data, many=True, max_length=self.max_rows)
+        serializer.is_valid(raise_exception=True)
+        tasks = bulk.create_tasks(serializer.validated_data, request.user)
+        results = [
+            {'index': index, 'id': task.pk}
+            for index, task in zip(serializer.row_indexes, tasks)
+        ]
+        return bulk_response(results, serializer.row_errors, status.HTTP_201_CREATED)
+
+
+class TaskBulkStatusView(generics.GenericAPIView):
+    serializer_class = TaskStatusUpdateSerializer
+    permission_classes = [IsAuthenticated]
+    max_rows = 5000
+    
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Task.objects.none()
+        return Task.objects.visible_to(self.request.user)
+    
+    def patch(self, request):
+        serializer = self.get_serializer(data=request.data, many=True, max_length=self.max_rows)
+        serializer.is_valid(raise_exception=True)
+        rows = serializer.validated_data
+        tasks = self.get_queryset().in_bulk([row['id'] for row in rows])
+        
+        row_errors = dict(serializer.row_errors)
+        updates, indexes, seen = [], [], set()
+        for index, row in zip(serializer.row_indexes, rows):
+            task = tasks.get(row['id'])
+            if task is None:
+                row_errors[index] = {'id': ['Task not found.']}
+                continue
+            if task.pk in seen:
+                # Only the first transition per task is applied
+                row_errors[index] = {'id': ['Task is listed more than once.']}
+                continue
+            seen.add(task.pk)
+            updates.append((task, row))
+            indexes.append(index)
+        
+        bulk.update_statuses(updates, request.user)
+        results = [
+            {'index': index, 'id': task.pk, 'status': task.status}
+            for index, (task, _) in zip(indexes, updates)
+        ]
+        return bulk_response(results, row_errors, status.HTTP_200_OK)
 
 
 class TaskReportView(generics.RetrieveAPIView):
@@ -86,7 +269,7 @@ class TaskReportView(generics.RetrieveAPIView):
     permission_classes = [IsAdmin]
     
     def get_queryset(self):
-        return Task.objects.filter(status='COMPLETED')
+        return Task.objects.filter(status='COMPLETED').select_related('assigned_to')
     
     def retrieve(self, request, *args, **kwargs):
         task = self.get_object()
@@ -99,45 +282,341 @@ class TaskReportView(generics.RetrieveAPIView):
         return Response(serializer.data)
 
 
+class TaskAnalyticsView(APIView):
+    """
+    Completed count, worked hours and average completion time per day or
+    month, read from TaskRollup. ?user=<id> for one assignee, ?admin=<id>
+    for an admin's team; by default the caller's own scope. ?from= and
+    ?to= (YYYY-MM-DD) default to the last twelve months.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get_date_param(self, name, default):
+        value = self.request.query_params.get(name)
+        if not value:
+            return default
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: 'Use the YYYY-MM-DD format.'})
+        return parsed
+    
+    def get_id_param(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        if not value.isdigit():
+            raise ValidationError({name: 'Must be a user id.'})
+        return int(value)
+    
+    def get_scope(self):
+        access = get_access(self.request)
+        user_id, admin_id = self.get_id_param('user'), self.get_id_param('admin')
+        if user_id is not None:
+            if not (user_id == access.user_id or access.manages(user_id)):
+                raise PermissionDenied("You cannot view this user's analytics")
+            return 'USER', user_id
+        if admin_id is not None:
+            if not (access.is_superadmin or access.is_admin and admin_id == access.user_id):
+                raise PermissionDenied("You cannot view this team's analytics")
+            return 'ADMIN', admin_id
+        if access.is_superadmin:
+            return 'GLOBAL', None
+        return ('ADMIN' if access.is_admin else 'USER'), access.user_id
+    
+    def get(self, request):
+        scope, user_id = self.get_scope()
+        interval = request.query_params.get('interval', 'month')
+        if interval not in ('day', 'month'):
+            raise ValidationError({'interval': 'Use day or month.'})
+        
+        end = self.get_date_param('to', timezone.localdate())
+        first_month = end.replace(day=1) - timedelta(days=335)
+        start = self.get_date_param('from', first_month.replace(day=1))
+        if start > end:
+            raise ValidationError({'from': 'Must not be after to.'})
+        
+        return Response({
+            'scope': scope,
+            'user': user_id,
+            'from': start,
+            'to': end,
+            'interval': interval,
+            'results': rollups.series(scope, user_id, start, end, interval),
+        })
+
+
+class _Echo:
+    """File-like object that hands csv.writer rows straight back"""
+    def write(self, value):
+        return value
+
+
+class TaskReportExportView(APIView):
+    """
+    Stream completed-task reports as CSV or NDJSON.
+
+    Rows come from a server-side cursor in chunks, so memory stays flat at
+    any result size. Filters: completed_from / completed_to (dates,
+    inclusive), admin (owning admin id) and assigned_to. The response type
+    is picked with ?output=csv|ndjson, as ?format= belongs to DRF.
+    """
+    permission_classes = [IsAdmin]
+    chunk_size = 2000
+    columns = (
+        ('id', 'id'),
+        ('title', 'title'),
+        ('description', 'description'),
+        ('assigned_to_username', 'assigned_to__username'),
+        ('assigned_to_email', 'assigned_to__email'),
+        ('due_date', 'due_date'),
+        ('completion_report', 'completion_report'),
+        ('worked_hours', 'worked_hours'),
+        ('completed_at', 'completed_at'),
+        ('created_at', 'created_at'),
+    )
+    
+    def get_date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise ValidationError({name: 'Use the YYYY-MM-DD format.'})
+        return timezone.make_aware(datetime.combine(parsed, time.min))
+    
+    def get_queryset(self):
+        params = self.request.query_params
+        queryset = Task.objects.reportable_by(self.request.user)
+        
+        completed_from = self.get_date_param('completed_from')
+        if completed_from:
+            queryset = queryset.filter(completed_at__gte=completed_from)
+        completed_to = self.get_date_param('completed_to')
+        if completed_to:
+            queryset = queryset.filter(completed_at__lt=completed_to + timedelta(days=1))
+        for param, lookup in (('admin', 'owner_admin_id'), ('assigned_to', 'assigned_to_id')):
+            if params.get(param):
+                if not params[param].isdigit():
+                    raise ValidationError({param: 'Must be a user id.'})
+                queryset = queryset.filter(**{lookup: params[param]})
+        
+        return queryset.order_by('completed_at', 'id').values_list(
+            *(lookup for _, lookup in self.columns)
+        )
+    
+    def stream_csv(self, rows):
+        writer = csv.writer(_Echo())
+        yield writer.writerow([name for name, _ in self.columns])
+        for row in rows:
+            yield writer.writerow([
+                value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in row
+            ])
+    
+    def stream_ndjson(self, rows):
+        names = [name for name, _ in self.columns]
+        for row in rows:
+            yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + '\n'
+    
+    def get(self, request):
+        output = request.query_params.get('output', 'csv')
+        if output == 'csv':
+            stream, content_type = self.stream_csv, 'text/csv'
+        elif output == 'ndjson':
+            stream, content_type = self.stream_ndjson, 'application/x-ndjson'
+        else:
+            return Response(
+                {'output': 'Choose csv or ndjson.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        rows = self.get_queryset().iterator(chunk_size=self.chunk_size)
+        response = StreamingHttpResponse(stream(rows), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="task-reports.{output}"'
+        return response
+
+
+class TaskTableCacheStatsView(APIView):
+    """Hit/miss counts of the web task table cache, for sizing it"""
+    permission_classes = [IsSuperAdmin]
+    
+    def get(self, request):
+        return Response(fragments.stats())
+
+
+# Async API Views
+# Read-only counterparts of TaskListView and TaskDetailView for ASGI servers.
+# DRF views are synchronous, so these are plain Django async views reusing
+# the DRF authentication, pagination and serializer; only the awaited cache
+# and ORM calls touch I/O.
+
+def _json_response(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(
+        JSONRenderer().render(data), status=status_code, content_type='application/json'
+    )
+
+
+def _error_response(exc):
+    # Same body DRF's exception handler renders for an APIException
+    data = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+    return _json_response(data, exc.status_code)
+
+
+async def _authenticate(request):
+    """Return (user, None) for a valid JWT, or (None, error response)"""
+    authenticator = CachedJWTAuthentication()
+    try:
+        result = await authenticator.aauthenticate(request)
+        if result is None:
+            raise NotAuthenticated()
+    except APIException as exc:
+        response = _error_response(exc)
+        response['WWW-Authenticate'] = authenticator.authenticate_header(request)
+        return None, response
+    return result[0], None
+
+
+async def task_list_async(request):
+    if request.method != 'GET':
+        return _json_response({'detail': 'Method not allowed.'}, status.HTTP_405_METHOD_NOT_ALLOWED)
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    
+    paginator = TaskCursorPagination()
+    drf_request = Request(request)
+    try:
+        rows = ValuesSerializer(TaskSerializer(
+            fields=TaskSerializer.select_fields(drf_request.query_params)
+        ))
+        page = await paginator.apaginate_queryset(
+            Task.objects.visible_to(user).values(
+                *dict.fromkeys(['id', 'created_at', *rows.lookups])
+            ),
+            drf_request
+        )
+    except APIException as exc:
+        return _error_response(exc)
+    return _json_response(paginator.get_paginated_response(rows.render(page)).data)
+
+
+async def task_detail_async(request, pk):
+    if request.method != 'GET':
+        return _json_response({'detail': 'Method not allowed.'}, status.HTTP_405_METHOD_NOT_ALLOWED)
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    
+    try:
+        task = await Task.objects.visible_to(user).with_users().aget(pk=pk)
+    except Task.DoesNotExist:
+        return _json_response({'detail': 'Not found.'}, status.HTTP_404_NOT_FOUND)
+    return _json_response(TaskSerializer(task).data)
+
+
 # Web Interface Views
 @login_required
 def admin_dashboard(request):
     if not (request.user.is_superadmin or request.user.is_admin):
         return redirect('/tasks/')
     
+    if request.user.is_superadmin:
+        counter = counters.get_counter('GLOBAL')
+    else:
+        counter = counters.get_counter('ADMIN', request.user.pk)
+    
     context = {
         'user': request.user,
+        'counter': counter,
     }
     return render(request, 'tasks/panel_dashboard.html', context)
 
+TASK_LIST_FILTERS = (
+    ('status', 'status'),
+    ('assigned_to', 'assigned_to_id'),
+    ('due_from', 'due_date__gte'),
+    ('due_to', 'due_date__lte'),
+)
+
+
+def filter_tasks(queryset, params):
+    """
+    Apply the web task list filters, each on an indexed column. Returns the
+    queryset and the cleaned values; malformed values are dropped rather
+    than rejected, as in a search form.
+    """
+    cleaned = {}
+    if params.get('status') in dict(Task.STATUS_CHOICES):
+        cleaned['status'] = params['status']
+    if params.get('assigned_to', '').isdigit():
+        cleaned['assigned_to'] = int(params['assigned_to'])
+    for param in ('due_from', 'due_to'):
+        try:
+            due_date = parse_date(params.get(param) or '')
+        except ValueError:
+            due_date = None
+        if due_date:
+            cleaned[param] = due_date
+    
+    lookups = {lookup: cleaned[param] for param, lookup in TASK_LIST_FILTERS if param in cleaned}
+    return queryset.filter(**lookups), cleaned
+
+
+def assignee_choices(user):
+    """(id, username) pairs for the assignee filter"""
+    if user.role == 'SUPERADMIN':
+        users = User.objects.filter(role='USER')
+    elif user.role == 'ADMIN':
+        users = User.objects.filter(admin=user)
+    else:
+        return []
+    return list(users.order_by('username').values_list('id', 'username'))
+
+
 @login_required
 def task_list(request):
-    if request.user.is_superadmin:
-        tasks = Task.objects.all()
-    elif request.user.is_admin:
-        # Admin sees tasks of their users and tasks they created
-        tasks = Task.objects.filter(
-            assigned_to__admin=request.user
-        ) | Task.objects.filter(assigned_by=request.user)
-    else:
-        # Regular user
-        tasks = Task.objects.filter(assigned_to=request.user)
+    # Admins see tasks of their users and tasks they created
+    tasks, filters = filter_tasks(
+        Task.objects.visible_to(request.user).with_users(), request.GET
+    )
+    
+    # The rendered table is cached per visibility scope; see tasks.fragments
+    key = fragments.table_key(request.user, filters, request.GET.get('page'))
+    table = fragments.get_table(key) if key else None
+    if table is None:
+        page = Paginator(tasks, settings.TASK_PAGE_SIZE).get_page(request.GET.get('page'))
+        
+        # Page links keep the active filters as cleaned, which the fragment
+        # key is built from, not the raw query string
+        query = urlencode([(param, filters[param]) for param, _ in TASK_LIST_FILTERS if param in filters])
+        
+        table = render_to_string('tasks/task_table.html', {
+            'tasks': page.object_list,
+            'page': page,
+            'query': query,
+            'user': request.user,
+        }, request)
+        if key:
+            fragments.set_table(key, table)
     
     context = {
-        'tasks': tasks,
+        'table': table,
+        'filters': filters,
+        'status_choices': Task.STATUS_CHOICES,
+        'assignees': assignee_choices(request.user),
         'user': request.user,
     }
     return render(request, 'tasks/task_list.html', context)
 
 @login_required
 def task_detail(request, task_id):
-    task = get_object_or_404(Task, id=task_id)
+    task = get_object_or_404(Task.objects.with_users(), id=task_id)
     
     # Check permissions
-    if request.user.role == 'USER' and task.assigned_to != request.user:
-        raise PermissionDenied("You do not have permission to view this task")
-    
-    if request.user.role == 'ADMIN' and task.assigned_to.admin != request.user:
+    if not task.is_visible_to(request.user):
         raise PermissionDenied("You do not have permission to view this task")
     
     context = {
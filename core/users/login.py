@@ -0,0 +1,30 @@
+"""
+Bounded password verification for the login endpoint.
+
+A password check is a deliberately slow PBKDF2 run, so a burst of logins
+can tie up every worker thread of a process. At most LOGIN_HASH_CONCURRENCY
+checks run at once per process; a login that cannot get a slot within
+LOGIN_HASH_WAIT seconds is refused with 429 instead of queueing behind the
+burst while other requests wait for a thread.
+"""
+import math
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from rest_framework.exceptions import Throttled
+
+_slots = threading.BoundedSemaphore(settings.LOGIN_HASH_CONCURRENCY)
+
+
+@contextmanager
+def verification_slot():
+    if not _slots.acquire(timeout=settings.LOGIN_HASH_WAIT):
+        raise Throttled(
+            wait=max(1, math.ceil(settings.LOGIN_HASH_WAIT)),
+            detail='Too many logins in progress, try again shortly.',
+        )
+    try:
+        yield
+    finally:
+        _slots.release()
@@ -0,0 +1,93 @@
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from tasks.management.commands._bench import rolled_back
+from users.models import User
+
+USERNAME = 'bench-login'
+PASSWORD = 'bench-password'
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure login throughput: the stateless JSON login against the session '
+        'form login one after another, then a concurrent burst of JSON logins '
+        'against the LOGIN_HASH_CONCURRENCY limit.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=10)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5)
+
+    def login(self, client, mode):
+        credentials = {'username': USERNAME, 'password': PASSWORD}
+        if mode == 'json':
+            return client.post('/users/api-login/', credentials, content_type='application/json')
+        return client.post('/users/api-login/', credentials)
+
+    def sequential(self, mode, count):
+        client = Client()
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(count):
+                response = self.login(client, mode)
+                assert response.status_code in (200, 302), response.status_code
+                client.cookies.clear()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'{mode:>5}: {count / elapsed:6.1f} logins/s, {len(queries) / count:.1f} queries per login'
+        )
+
+    def burst(self, threads, seconds):
+        deadline = time.perf_counter() + seconds
+        results = {'ok': [], 'refused': 0}
+        lock = threading.Lock()
+
+        def worker():
+            client = Client()
+            try:
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    response = self.login(client, 'json')
+                    with lock:
+                        if response.status_code == 200:
+                            results['ok'].append(time.perf_counter() - start)
+                        else:
+                            results['refused'] += 1
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        ok = results['ok']
+        median = statistics.median(ok) * 1000 if ok else 0
+        self.stdout.write(
+            f'burst: {threads} threads, {settings.LOGIN_HASH_CONCURRENCY} hash slots: '
+            f'{len(ok) / seconds:6.1f} logins/s, median {median:.0f} ms, {results["refused"]} refused (429)'
+        )
+
+    def handle(self, *args, **options):
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            with rolled_back():
+                User.objects.create_user(USERNAME, password=PASSWORD)
+                for mode in ('json', 'form'):
+                    self.sequential(mode, options['logins'])
+
+            # Other threads only see committed rows
+            user = User.objects.create_user(USERNAME, password=PASSWORD)
+            try:
+                self.burst(options['threads'], options['seconds'])
+            finally:
+                user.delete()
@@ -0,0 +1,129 @@
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, models
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist import models as blacklist_models
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from tasks.management.commands._bench import rolled_back
+from users.models import RevokedToken, User
+from users.serializers import RevocableTokenRefreshSerializer
+from users.tokens import RevocableRefreshToken
+
+
+# token_blacklist is not installed, so its models are abstract; these are
+# the same tables under the users app, created and dropped by the benchmark
+class OutstandingToken(blacklist_models.OutstandingToken):
+    class Meta:
+        app_label = 'users'
+        db_table = 'bench_outstanding_token'
+
+
+class BlacklistedToken(models.Model):
+    token = models.OneToOneField(OutstandingToken, on_delete=models.CASCADE)
+    blacklisted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        app_label = 'users'
+        db_table = 'bench_blacklisted_token'
+
+
+class StockRefreshToken(RefreshToken):
+    """The queries BlacklistMixin runs when token_blacklist is installed"""
+
+    def verify(self, *args, **kwargs):
+        if BlacklistedToken.objects.filter(token__jti=self.payload[api_settings.JTI_CLAIM]).exists():
+            raise TokenError('Token is blacklisted')
+        super().verify(*args, **kwargs)
+
+    def blacklist(self):
+        token, _ = OutstandingToken.objects.get_or_create(
+            jti=self.payload[api_settings.JTI_CLAIM],
+            defaults={'token': str(self), 'expires_at': datetime_from_epoch(self.payload['exp'])},
+        )
+        return BlacklistedToken.objects.get_or_create(token=token)
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        OutstandingToken.objects.create(
+            user=user, jti=token[api_settings.JTI_CLAIM], token=str(token),
+            created_at=token.current_time, expires_at=datetime_from_epoch(token['exp']),
+        )
+        return token
+
+
+class StockRefreshSerializer(TokenRefreshSerializer):
+    token_class = StockRefreshToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare refresh-token rotation throughput of users.tokens with the '
+        'stock token_blacklist tables, each preloaded with revoked tokens. '
+        'Data and the temporary blacklist tables are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--refreshes', type=int, default=2000)
+        parser.add_argument('--revoked', type=int, default=100_000)
+
+    def rotate(self, serializer_class, token_class, user, count):
+        tokens = [str(token_class.for_user(user)) for _ in range(count)]
+        start = time.perf_counter()
+        for token in tokens:
+            serializer = serializer_class(data={'refresh': token})
+            serializer.is_valid(raise_exception=True)
+        rate = count / (time.perf_counter() - start)
+
+        # Replaying a rotated token must fail
+        try:
+            serializer_class(data={'refresh': tokens[0]}).is_valid(raise_exception=True)
+        except TokenError:
+            pass
+        else:
+            raise AssertionError('A rotated token was accepted again')
+        return rate
+
+    def handle(self, *args, **options):
+        # SQLite cannot change the schema inside the rolled back transaction
+        with connection.schema_editor() as editor:
+            editor.create_model(OutstandingToken)
+            editor.create_model(BlacklistedToken)
+        try:
+            with rolled_back():
+                self.compare(options['refreshes'], options['revoked'])
+        finally:
+            with connection.schema_editor() as editor:
+                editor.delete_model(BlacklistedToken)
+                editor.delete_model(OutstandingToken)
+
+    def compare(self, refreshes, revoked):
+        expires_at = timezone.now() + timedelta(days=7)
+        user = User.objects.create_user('bench-refresh')
+        self.stdout.write(f'Preloading {revoked} revoked tokens into each store...')
+        outstanding = OutstandingToken.objects.bulk_create([
+            OutstandingToken(user=user, jti=f'old-{i}', token='', expires_at=expires_at)
+            for i in range(revoked)
+        ], batch_size=5000)
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token=token) for token in outstanding], batch_size=5000
+        )
+        RevokedToken.objects.bulk_create([
+            RevokedToken(jti=f'old-{i}', expires_at=expires_at) for i in range(revoked)
+        ], batch_size=5000)
+        cache.clear()
+
+        for label, serializer_class, token_class in (
+            ('token_blacklist', StockRefreshSerializer, StockRefreshToken),
+            ('users.tokens', RevocableTokenRefreshSerializer, RevocableRefreshToken),
+        ):
+            rate = self.rotate(serializer_class, token_class, user, refreshes)
+            self.stdout.write(f'{label:>16}: {rate:8.0f} refreshes/s')
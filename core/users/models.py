@@ -39,4 +39,12 @@ class User(AbstractUser, BaseModel):
     class Meta:
         verbose_name = 'User'
         verbose_name_plural = 'Users'
-        ordering = ['-date_joined']
\ No newline at end of file
+        ordering = ['-date_joined']
+
+class RevokedToken(models.Model):
+    """A refresh token that may not be used again, kept until it expires anyway"""
+    jti = models.CharField(max_length=255, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    def __str__(self):
+        return self.jti
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from .models import User
+from .tokens import RevocableRefreshToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -55,4 +57,9 @@ class LoginSerializer(serializers.Serializer):
 class TokenSerializer(serializers.Serializer):
     access = serializers.CharField()
     refresh = serializers.CharField()
-    user = UserSerializer()
\ No newline at end of file
+    user = UserSerializer()
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """Rotation revokes the presented refresh token through users.tokens"""
+    token_class = RevocableRefreshToken
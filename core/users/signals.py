@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from utils.authentication import invalidate_cached_user
+from utils.conditional import USERNAMES_VERSION_KEY, bump_versions
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def drop_cached_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def bump_usernames_version(sender, instance, created, update_fields=None, **kwargs):
+    """Task responses show the usernames of the users they point at"""
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    bump_versions([USERNAMES_VERSION_KEY])
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def bump_usernames_version_on_delete(sender, instance, **kwargs):
+    # Tasks it assigned, created or updated lose the user through SET_NULL
+    bump_versions([USERNAMES_VERSION_KEY])
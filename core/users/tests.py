@@ -1,3 +1,142 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+from utils.authentication import CachedJWTAuthentication
+
+from . import login, tokens
+from .models import RevokedToken, User
+from .tokens import RevocableRefreshToken
+
+
+@override_settings(PASSWORD_HASHERS=[
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+])
+class TokenLoginTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            username='user1', role='USER', password=make_password('secret', hasher='md5')
+        )
+        self.client = APIClient()
+
+    def post(self, password='secret'):
+        return self.client.post(
+            '/users/api-login/', {'username': 'user1', 'password': password}, format='json'
+        )
+
+    def test_json_login_is_stateless(self):
+        response = self.post()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {'access', 'refresh', 'user'})
+        self.assertFalse(Session.objects.exists())
+        self.assertNotIn('sessionid', response.cookies)
+
+        # The outdated hash was upgraded while the password was at hand
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+        self.assertIsNotNone(self.user.last_login)
+        self.assertEqual(self.post('wrong').status_code, 400)
+
+    @override_settings(LOGIN_HASH_WAIT=0)
+    def test_saturated_login_is_refused(self):
+        taken = 0
+        while login._slots.acquire(blocking=False):
+            taken += 1
+        try:
+            response = self.post()
+        finally:
+            for _ in range(taken):
+                login._slots.release()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+
+
+class TokenRefreshTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='user1', role='USER')
+        self.client = APIClient()
+        cache.clear()
+
+    def refresh(self, token):
+        return self.client.post('/users/token/refresh/', {'refresh': str(token)}, format='json')
+
+    def test_rotation_revokes_the_old_token(self):
+        token = RevocableRefreshToken.for_user(self.user)
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 401)
+        # Still refused once the cache has forgotten it
+        cache.clear()
+        self.assertEqual(self.refresh(token).status_code, 401)
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, 200)
+
+    def test_prune_deletes_only_expired_tokens(self):
+        now = timezone.now()
+        RevokedToken.objects.bulk_create([
+            RevokedToken(jti='old', expires_at=now - timedelta(days=1)),
+            RevokedToken(jti='live', expires_at=now + timedelta(days=1)),
+        ])
+        self.assertEqual(tokens.prune(batch_size=1), 1)
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['live'])
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='user1', role='USER')
+        self.token = AccessToken.for_user(self.user)
+        self.auth = CachedJWTAuthentication()
+        cache.clear()
+
+    def test_snapshot_is_served_from_cache(self):
+        with self.assertNumQueries(1):
+            self.auth.get_user(self.token)
+        with self.assertNumQueries(0):
+            user = self.auth.get_user(self.token)
+        self.assertEqual((user.pk, user.role), (self.user.pk, 'USER'))
+
+    def test_role_change_drops_the_snapshot(self):
+        self.auth.get_user(self.token)
+        self.user.role = 'ADMIN'
+        self.user.save()
+        self.assertEqual(self.auth.get_user(self.token).role, 'ADMIN')
+
+    def test_deactivation_drops_the_snapshot(self):
+        self.auth.get_user(self.token)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(self.token)
+
+    def test_delete_drops_the_snapshot(self):
+        self.auth.get_user(self.token)
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(self.token)
+
+
+class SessionTests(TestCase):
+    def test_form_login_keeps_tokens_out_of_the_session(self):
+        User.objects.create_user('user1', password='secret', role='USER')
+        response = self.client.post('/users/api-login/', {'username': 'user1', 'password': 'secret'})
+        self.assertRedirects(response, '/tasks/', fetch_redirect_response=False)
+        self.assertEqual(set(self.client.session.keys()), {
+            '_auth_user_id', '_auth_user_backend', '_auth_user_hash'
+        })
+
+    def test_purge_sessions(self):
+        now = timezone.now()
+        Session.objects.bulk_create([
+            Session(session_key=f'old{i}', session_data='', expire_date=now - timedelta(days=1))
+            for i in range(3)
+        ] + [Session(session_key='live', session_data='', expire_date=now + timedelta(days=1))])
+        call_command('purge_sessions', batch_size=2, stdout=StringIO())
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
@@ -0,0 +1,68 @@
+"""
+Refresh token revocation, replacing simplejwt's token_blacklist app.
+
+A revoked token is one RevokedToken row keyed by its jti, plus a cache
+entry that lives exactly as long as the token would. A check is a cache
+hit for recently revoked tokens and a primary key lookup otherwise;
+nothing is recorded for tokens that are still valid. Revoking is an
+INSERT that fails when the jti is already there, so two refreshes racing
+with the same token cannot both succeed. Rows of expired tokens are
+deleted by prune_revoked_tokens through the expires_at index.
+"""
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import RevokedToken
+
+
+def revoked_key(jti):
+    return f'revoked-token:{jti}'
+
+
+def is_revoked(jti):
+    if cache.get(revoked_key(jti)):
+        return True
+    return RevokedToken.objects.filter(jti=jti).exists()
+
+
+def revoke(jti, exp):
+    """Revoke a token until its expiry; returns False if it already was"""
+    expires_at = datetime_from_epoch(exp)
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+        revoked = True
+    except IntegrityError:
+        revoked = False
+    remaining = (expires_at - timezone.now()).total_seconds()
+    if remaining > 0:
+        cache.set(revoked_key(jti), True, remaining)
+    return revoked
+
+
+def prune(batch_size=10_000, now=None):
+    """Delete rows of tokens that have expired, in batches; returns the count"""
+    expired = RevokedToken.objects.filter(expires_at__lt=now or timezone.now())
+    deleted = 0
+    while True:
+        batch = list(expired.values_list('jti', flat=True)[:batch_size])
+        if not batch:
+            return deleted
+        deleted += RevokedToken.objects.filter(jti__in=batch).delete()[0]
+
+
+class RevocableRefreshToken(RefreshToken):
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        if is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+    
+    def blacklist(self):
+        if not revoke(self.payload[api_settings.JTI_CLAIM], self.payload['exp']):
+            raise TokenError(_('Token is blacklisted'))
@@ -1,4 +1,5 @@
 from django.urls import path
+from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
     CustomLoginView, LogoutView, 
     UserListCreateView, UserDetailView, AdminUserListView,
@@ -16,5 +17,6 @@ urlpatterns = [
     path('admins/', AdminUserListView.as_view(), name='admin-list'),
     path('api-login/', CustomLoginView.as_view(), name='api-login'),
     path('api-logout/', LogoutView.as_view(), name='api-logout'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
 
 ]
\ No newline at end of file
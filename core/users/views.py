@@ -1,14 +1,19 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, logout
+from django.contrib.auth.models import update_last_login
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework import generics, status
+from rest_framework.exceptions import Throttled
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework.views import APIView
+from .login import verification_slot
 from .models import User
 from .serializers import UserSerializer, LoginSerializer, TokenSerializer
+from .tokens import RevocableRefreshToken
+from utils.conditional import ConditionalListMixin, ConditionalRetrieveMixin
 from utils.permissions import IsSuperAdmin, IsAdmin
 
 
@@ -25,36 +30,53 @@ class CustomLoginView(APIView):
     
     @csrf_exempt
     def post(self, request):
+        if request.content_type.startswith('application/json'):
+            return self.token_login(request)
+        
         serializer = LoginSerializer(data=request.data)
-        if serializer.is_valid():
+        try:
+            with verification_slot():
+                valid = serializer.is_valid()
+        except Throttled as exc:
+            return render(
+                request, 'users/login.html', {'error': exc.detail},
+                status=status.HTTP_429_TOO_MANY_REQUESTS
+            )
+        if valid:
             user = serializer.validated_data['user']
+            # The web panel authenticates with the session alone; API
+            # clients get their tokens from the JSON login
             login(request, user)
             
-            # Create JWT tokens
-            refresh = RefreshToken.for_user(user)
-            
-            # Store tokens in session for web access
-            request.session['access_token'] = str(refresh.access_token)
-            request.session['refresh_token'] = str(refresh)
-            
-            # Return JSON response for API
-            if request.content_type == 'application/json':
-                data = {
-                    'access': str(refresh.access_token),
-                    'refresh': str(refresh),
-                    'user': UserSerializer(user).data
-                }
-                return Response(data, status=status.HTTP_200_OK)
-            
             # Redirect to appropriate dashboard
             if user.is_superadmin or user.is_admin:
                 return redirect('/tasks/dashboard/')
             return redirect('/tasks/')
         
-        if request.content_type == 'application/json':
+        return render(request, 'users/login.html', {'error': 'Invalid credentials'})
+    
+    def token_login(self, request):
+        """
+        Stateless login for API clients: no session row, only the tokens.
+        authenticate() still upgrades a hash made with outdated hasher
+        settings once the password has been verified.
+        """
+        serializer = LoginSerializer(data=request.data)
+        with verification_slot():
+            valid = serializer.is_valid()
+        if not valid:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        return render(request, 'users/login.html', {'error': 'Invalid credentials'})
+        user = serializer.validated_data['user']
+        refresh = RevocableRefreshToken.for_user(user)
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
+        data = {
+            'access': str(refresh.access_token),
+            'refresh': str(refresh),
+            'user': UserSerializer(user).data
+        }
+        return Response(data, status=status.HTTP_200_OK)
 
 
 class LogoutView(APIView):
@@ -88,9 +110,11 @@ class UserListCreateView(generics.ListCreateAPIView):
             user.save()
 
 
-class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
+class UserDetailView(ConditionalRetrieveMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    # Logins only write last_login
+    validator_fields = ('updated_at', 'last_login')
     
     def get_permissions(self):
         if self.request.method in ['PUT', 'PATCH', 'DELETE']:
@@ -98,9 +122,10 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
         return [IsAdmin()]
 
 
-class AdminUserListView(generics.ListAPIView):
+class AdminUserListView(ConditionalListMixin, generics.ListAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsSuperAdmin]
+    validator_fields = ('updated_at', 'last_login')
     
     def get_queryset(self):
         return User.objects.filter(role__in=['ADMIN', 'SUPERADMIN'])
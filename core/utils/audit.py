@@ -0,0 +1,67 @@
+"""
+The user behind the current writes, for BaseModel's created_by/updated_by.
+
+The value lives in context variables rather than a thread-local, so it is
+isolated per request under ASGI and follows sync_to_async hops. Requests
+set it through AuditMiddleware; management commands and batch jobs use
+audit_as() around their writes.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+_audit_user = ContextVar('audit_user', default=None)
+_audit_request = ContextVar('audit_request', default=None)
+
+
+def get_audit_user():
+    """The authenticated user writes are attributed to, or None"""
+    user = _audit_user.get()
+    if user is None:
+        request = _audit_request.get()
+        if request is None:
+            return None
+        # Read lazily: DRF authenticates after middleware has run and then
+        # assigns its user to the wrapped HttpRequest
+        user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    return user
+
+
+@contextmanager
+def audit_as(user):
+    """Attribute every save inside the block to `user`"""
+    token = _audit_user.set(user)
+    try:
+        yield user
+    finally:
+        _audit_user.reset(token)
+
+
+class AuditMiddleware:
+    """Expose the current request to get_audit_user() for the whole request"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _audit_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _audit_request.reset(token)
+
+    async def __acall__(self, request):
+        token = _audit_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _audit_request.reset(token)
@@ -0,0 +1,118 @@
+"""
+Conditional GET for the polled API views.
+
+A view's ETag is derived from cheap validators: for a list, the row count
+and the latest value of each `validator_fields` column over the whole
+filtered queryset, in one aggregate query; for a single object, the same
+columns on the row that was loaded anyway. A matching If-None-Match is
+answered with 304 Not Modified before anything is paginated or serialized.
+
+Responses are private to the authenticated caller: they vary on
+Authorization and must be revalidated before reuse.
+
+Values a response shows from other rows, such as the usernames of the users
+a task points at, are covered by versions kept in the cache and bumped by
+the writes that change them.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+USERNAMES_VERSION_KEY = 'conditional:usernames'
+
+
+def cache_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Seeded from the clock, so a version lost to eviction restarts above
+        # every number it reached and cannot match an old validator
+        version = time.time_ns()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_versions(keys):
+    """Increment each cache version once the transaction commits"""
+    keys = set(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def _bump(keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            # No version stored: the next reader seeds a fresh one anyway
+            pass
+
+
+def usernames_version():
+    """Changes whenever a user is renamed or deleted"""
+    return cache_version(USERNAMES_VERSION_KEY)
+
+
+def make_etag(*values):
+    return quote_etag(hashlib.md5(repr(values).encode()).hexdigest())
+
+
+def etag_matches(request, etag):
+    """If-None-Match uses the weak comparison, so W/ prefixes are ignored"""
+    header = request.headers.get('If-None-Match')
+    if etag is None or not header:
+        return False
+    etags = {tag.removeprefix('W/') for tag in parse_etags(header)}
+    return '*' in etags or etag in etags
+
+
+def conditional_response(request, etag, respond):
+    """Return 304 if the client holds `etag`, else the response built by `respond()`"""
+    if etag_matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = respond()
+    if etag is not None and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+        response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+class ConditionalListMixin:
+    validator_fields = ('updated_at',)
+
+    def get_list_etag(self, queryset):
+        """ETag for the whole filtered queryset, or None to skip the check"""
+        summary = queryset.order_by().aggregate(
+            count=Count('pk'),
+            **{field: Max(field) for field in self.validator_fields}
+        )
+        return make_etag(self.request.user.pk, *summary.values())
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_list_etag(self.filter_queryset(self.get_queryset()))
+        respond = super().list
+        return conditional_response(request, etag, lambda: respond(request, *args, **kwargs))
+
+
+class ConditionalRetrieveMixin:
+    validator_fields = ('updated_at',)
+
+    def get_object_etag(self, instance):
+        return make_etag(instance.pk, *(getattr(instance, field) for field in self.validator_fields))
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return conditional_response(
+            request,
+            self.get_object_etag(instance),
+            lambda: Response(self.get_serializer(instance).data),
+        )
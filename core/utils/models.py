@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from utils.audit import get_audit_user
 
 class BaseModel(models.Model):
     """Base model with common fields"""
@@ -25,20 +26,11 @@ class BaseModel(models.Model):
         abstract = True
     
     def save(self, *args, **kwargs):
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        if not self.pk and not self.created_by_id:
-            # Try to get current user from thread local
-            from crum import get_current_user
-            user = get_current_user()
-            if user and isinstance(user, User):
+        # Attribute the write to the request or audit_as() user, if any
+        user = get_audit_user()
+        if user is not None:
+            if not self.pk and not self.created_by_id:
                 self.created_by = user
-        
-        # Always update updated_by
-        from crum import get_current_user
-        user = get_current_user()
-        if user and isinstance(user, User):
             self.updated_by = user
         
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
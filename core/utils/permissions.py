@@ -1,24 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
 from rest_framework import permissions
 
 
+ADMIN_ROLES = ('ADMIN', 'SUPERADMIN')
+
+
+class RequestAccess:
+    """The request user's role, resolved once and reused by every check"""
+
+    def __init__(self, user):
+        self.user_id = user.pk
+        self.is_authenticated = user.is_authenticated
+        self.role = getattr(user, 'role', None) if self.is_authenticated else None
+        self.is_superadmin = self.role == 'SUPERADMIN'
+        self.is_admin = self.role in ADMIN_ROLES
+        self.is_regular_user = self.role == 'USER'
+
+    def owns(self, obj):
+        """Compare foreign key ids so the related user is never loaded"""
+        return obj.assigned_to_id == self.user_id
+
+    @cached_property
+    def managed_user_ids(self):
+        """Ids of the users this admin manages, loaded on first use"""
+        if not self.is_admin:
+            return frozenset()
+        return frozenset(
+            get_user_model().objects.filter(admin_id=self.user_id).values_list('pk', flat=True)
+        )
+
+    def manages(self, user_id):
+        """Superadmins manage everyone, admins the users whose admin they are"""
+        return self.is_superadmin or (self.is_admin and user_id in self.managed_user_ids)
+
+
+def get_access(request):
+    access = getattr(request, '_access', None)
+    if access is None or access.user_id != request.user.pk:
+        access = request._access = RequestAccess(request.user)
+    return access
+
+
 class IsSuperAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.role == 'SUPERADMIN'
+        return get_access(request).is_superadmin
 
 class IsAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.role in ['ADMIN', 'SUPERADMIN']
+        return get_access(request).is_admin
 
 class IsUser(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.role == 'USER'
+        return get_access(request).is_regular_user
 
 class IsTaskOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        return obj.assigned_to == request.user
+        return get_access(request).owns(obj)
 
 class IsAdminOrTaskOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        if request.user.role in ['ADMIN', 'SUPERADMIN']:
-            return True
-        return obj.assigned_to == request.user
\ No newline at end of file
+        access = get_access(request)
+        return access.is_admin or access.owns(obj)